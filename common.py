@@ -0,0 +1,144 @@
+"""
+Helpers shared by the standalone scraper and caller scripts.
+"""
+import asyncio
+import hmac
+from functools import lru_cache
+
+try:
+    import uvloop
+except ImportError:
+    # Optional faster event loop (not on Windows) - stock asyncio otherwise
+    uvloop = None
+
+
+class _DigitTable(dict):
+    """
+    str.translate table that keeps ASCII digits and deletes everything else.
+
+    Characters are added on first sight, so after warm-up every lookup is a
+    plain dict hit in C.
+    """
+
+    def __missing__(self, codepoint):
+        self[codepoint] = None
+        return None
+
+
+DIGIT_TABLE = _DigitTable({ord(d): ord(d) for d in "0123456789"})
+
+
+@lru_cache(maxsize=8192)  # Chains list the same number across many zips/cards
+def normalize_phone(phone: str) -> str:
+    """Clean and format phone number to +1XXXXXXXXXX format."""
+    if not phone:
+        return None
+    digits = phone.translate(DIGIT_TABLE)
+    if len(digits) == 10:
+        return f"+1{digits}"
+    elif len(digits) == 11 and digits.startswith('1'):
+        return f"+{digits}"
+    return None
+
+
+def phone_key(phone: str) -> int:
+    """Compact dedupe key for a normalized +1XXXXXXXXXX number."""
+    return int(phone[1:])
+
+
+def retry_after(response, default: float) -> float:
+    """Seconds to back off, from the Retry-After header when it's numeric."""
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return default
+
+
+def run_async(main):
+    """asyncio.run(main), on uvloop when it's installed."""
+    if uvloop is not None:
+        return uvloop.run(main)
+    return asyncio.run(main)
+
+
+class CallEvents:
+    """Hands end-of-call reports from a webhook to the coroutine waiting on the call."""
+
+    def __init__(self):
+        self._futures = {}
+
+    def _future(self, call_id: str) -> asyncio.Future:
+        if call_id not in self._futures:
+            self._futures[call_id] = asyncio.get_running_loop().create_future()
+        return self._futures[call_id]
+
+    def resolve(self, call_id: str, call: dict):
+        """
+        Hand a finished call to the coroutine waiting on it.
+
+        Reports for unknown calls, or for calls whose wait already timed out,
+        are dropped so late webhooks can't pile up futures. Callers start
+        waiting as soon as the call ID comes back, before any report can.
+        """
+        future = self._futures.get(call_id)
+        if future is not None and not future.done():
+            future.set_result(call)
+
+    async def wait(self, call_id: str, timeout: float) -> dict:
+        """Wait for a call's end-of-call report; raises TimeoutError."""
+        try:
+            return await asyncio.wait_for(asyncio.shield(self._future(call_id)), timeout)
+        finally:
+            self._futures.pop(call_id, None)
+
+
+class RateLimiter:
+    """
+    Fixed-interval limiter: wait() returns at most once per interval seconds.
+
+    hold() pauses it when the server says to slow down.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.next = 0.0
+
+    async def wait(self):
+        now = asyncio.get_running_loop().time()
+        start = max(now, self.next)
+        # Claim the slot before sleeping so concurrent waiters queue up behind it
+        self.next = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    def hold(self, seconds: float):
+        """Push the next slot at least `seconds` out (e.g. after a 429 Retry-After)."""
+        self.next = max(self.next, asyncio.get_running_loop().time() + seconds)
+
+
+def create_vapi_webhook_app(events: CallEvents, secret: str = ""):
+    """
+    Build the FastAPI app that receives Vapi server messages.
+
+    With a secret, requests whose x-vapi-secret header doesn't match are rejected.
+    """
+    from fastapi import FastAPI, HTTPException, Request
+
+    app = FastAPI()
+
+    @app.post("/")
+    async def vapi_webhook(request: Request):
+        if secret and not hmac.compare_digest(request.headers.get("x-vapi-secret", ""), secret):
+            raise HTTPException(status_code=401, detail="bad secret")
+        message = (await request.json()).get("message", {})
+        if message.get("type") == "end-of-call-report":
+            call = dict(message.get("call", {}))
+            call["status"] = "ended"
+            call["endedReason"] = message.get("endedReason", call.get("endedReason"))
+            call["messages"] = (message.get("artifact") or {}).get("messages") or message.get("messages", [])
+            call["duration"] = message.get("durationSeconds", call.get("duration", 0))
+            if call.get("id"):
+                events.resolve(call["id"], call)
+        return {"status": "received"}
+
+    return app
@@ -929,7 +929,7 @@ async def scrape_city(request: ScrapeRequest, background_tasks: BackgroundTasks)
     """Start a scrape job for a city."""
     try:
         scraper = HVACLeadScraper()
-        stats = scraper.scrape_city(
+        stats = await scraper.scrape_city_async(
             request.city, 
             request.state, 
             limit_per_query=request.limit
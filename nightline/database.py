@@ -4,9 +4,9 @@ Database models and session management for Nightline.
 from datetime import datetime
 from enum import Enum
 from typing import Optional
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, Boolean, Float, ForeignKey, Enum as SQLEnum
+from sqlalchemy import create_engine, event, insert, select, Column, Index, Integer, String, DateTime, Text, Boolean, Float, ForeignKey, Enum as SQLEnum
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, relationship
+from sqlalchemy.orm import sessionmaker, relationship, Session
 
 from .config import DATABASE_URL
 
@@ -16,6 +16,17 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL journaling on SQLite so bulk scrape writes don't block readers."""
+    if engine.dialect.name != "sqlite":
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.close()
+
+
 class LeadStatus(str, Enum):
     """Status of a lead in the pipeline."""
     NEW = "new"                    # Just scraped, not yet called
@@ -42,6 +53,10 @@ class Lead(Base):
     A business lead scraped from Google Maps or Google Local Services Ads.
     """
     __tablename__ = "leads"
+    __table_args__ = (
+        # Covers get_leads_for_calling's status + claims_24_7 filter
+        Index("ix_lead_calling", "status", "claims_24_7"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -159,6 +174,10 @@ class ScrapeRun(Base):
 def init_db():
     """Initialize the database, creating all tables."""
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist, so add any newer indexes
+    # to databases created before them
+    for index in Lead.__table__.indexes:
+        index.create(bind=engine, checkfirst=True)
 
 
 def get_db():
@@ -174,3 +193,63 @@ def get_session():
     """Get a database session (non-generator version)."""
     return SessionLocal()
 
+
+
+def lead_to_row(lead: Lead) -> dict:
+    """
+    Convert an unsaved Lead into a plain column dict for Core inserts.
+    
+    Only attributes that were explicitly set are included, so column
+    defaults (timestamps etc.) still apply.
+    """
+    return {
+        column.key: lead.__dict__[column.key]
+        for column in Lead.__table__.columns
+        if column.key in lead.__dict__
+    }
+
+
+def existing_business_ids(session: Session, business_ids) -> set[str]:
+    """Return which of the given business_ids are already stored (one query)."""
+    business_ids = set(business_ids)
+    if not business_ids:
+        return set()
+    return set(session.scalars(
+        select(Lead.business_id).where(Lead.business_id.in_(business_ids))
+    ))
+
+
+def insert_new_leads(session: Session, rows: list[dict]) -> set[str]:
+    """
+    Insert lead rows, skipping any whose business_id already exists.
+    
+    Uses a single INSERT ... ON CONFLICT DO NOTHING on SQLite/PostgreSQL.
+    
+    Returns:
+        The business_ids that were actually inserted
+    """
+    if not rows:
+        return set()
+    
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    elif dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    else:
+        # No portable upsert - filter against existing IDs first
+        existing = existing_business_ids(session, (row["business_id"] for row in rows))
+        new_rows = {}
+        for row in rows:
+            if row["business_id"] not in existing:
+                new_rows.setdefault(row["business_id"], row)
+        if new_rows:
+            session.execute(insert(Lead.__table__), list(new_rows.values()))
+        return set(new_rows)
+    
+    stmt = (
+        dialect_insert(Lead.__table__)
+        .on_conflict_do_nothing(index_elements=["business_id"])
+        .returning(Lead.business_id)
+    )
+    return {business_id for (business_id,) in session.execute(stmt, rows)}
@@ -13,6 +13,7 @@ import random
 import re
 import time
 from datetime import datetime
+from functools import lru_cache
 from typing import Optional, List, Dict, Any, Tuple
 from urllib.parse import quote_plus
 
@@ -31,10 +32,39 @@ from .config import (
     get_industry_config,
     get_cities_for_region,
 )
-from .database import Lead, ScrapeRun, LeadStatus, get_session, init_db
+from .database import (
+    Lead,
+    ScrapeRun,
+    LeadStatus,
+    get_session,
+    init_db,
+    insert_new_leads,
+    lead_to_row,
+)
 
 console = Console()
 
+# Scroll until the number of result cards stops growing (runs in the page)
+_SCROLL_UNTIL_STABLE_JS = """
+async ({selector, maxScrolls, delayMs}) => {
+    let last = 0;
+    for (let i = 0; i < maxScrolls; i++) {
+        const count = document.querySelectorAll(selector).length;
+        if (count === last && i > 2) break;
+        last = count;
+        window.scrollTo(0, document.body.scrollHeight);
+        await new Promise(r => setTimeout(r, delayMs + 300 + Math.random() * 500));
+    }
+    return last;
+}
+"""
+
+_LSA_PROLIST_URL = "https://www.google.com/localservices/prolist"
+
+# Anything the phone patterns below match besides digits (\s includes
+# Unicode spaces such as NBSP, so this can't be a fixed translate table)
+_NON_DIGITS = re.compile(r'\D')
+
 
 def _generate_business_id(name: str, city: str, state: str) -> str:
     """Generate a unique ID for an LSA business based on name + location."""
@@ -42,6 +72,13 @@ def _generate_business_id(name: str, city: str, state: str) -> str:
     return f"lsa_{hashlib.md5(raw.encode()).hexdigest()[:16]}"
 
 
+@lru_cache(maxsize=1024)
+def _build_lsa_url_cached(query: str, location: str) -> str:
+    """Build (and memoize) the prolist URL for a query + location pair."""
+    return f"{_LSA_PROLIST_URL}?src=2&q={quote_plus(f'{query} near {location}')}"
+
+
+@lru_cache(maxsize=4096)
 def _clean_phone(text: str) -> Optional[str]:
     """Extract and clean a US phone number from text."""
     # Look for patterns like (213) 555-1234, 213-555-1234, 2135551234
@@ -52,7 +89,7 @@ def _clean_phone(text: str) -> Optional[str]:
     for pattern in patterns:
         match = re.search(pattern, text)
         if match:
-            digits = re.sub(r'\D', '', match.group())
+            digits = _NON_DIGITS.sub('', match.group())
             if len(digits) == 10:
                 return f"+1{digits}"
             elif len(digits) == 11 and digits.startswith('1'):
@@ -60,6 +97,7 @@ def _clean_phone(text: str) -> Optional[str]:
     return None
 
 
+@lru_cache(maxsize=4096)
 def _parse_review_count(text: str) -> Optional[int]:
     """Parse review count from text like '(123)' or '123 reviews'."""
     match = re.search(r'(\d[\d,]*)', text)
@@ -68,6 +106,7 @@ def _parse_review_count(text: str) -> Optional[int]:
     return None
 
 
+@lru_cache(maxsize=4096)
 def _parse_rating(text: str) -> Optional[float]:
     """Parse rating from text like '4.8' or '4.8 stars'."""
     match = re.search(r'(\d\.\d)', text)
@@ -129,34 +168,23 @@ class LSAScraper:
     
     def _build_lsa_url(self, query: str, location: str) -> str:
         """Build a Google Local Services URL."""
-        full_query = f"{query} near {location}"
-        return (
-            f"https://www.google.com/localservices/prolist"
-            f"?src=2&q={quote_plus(full_query)}"
-        )
+        return _build_lsa_url_cached(query, location)
     
     async def _scroll_for_results(self, page, max_scrolls: int = None):
-        """Scroll the page to load more LSA results."""
+        """
+        Scroll the page to load more LSA results.
+        
+        The whole count -> scroll -> wait loop runs inside the browser in a
+        single evaluate call, instead of two round-trips per scroll.
+        """
         if max_scrolls is None:
             max_scrolls = LSA_MAX_SCROLLS
         
-        last_count = 0
-        for i in range(max_scrolls):
-            # Count current results
-            cards = await page.query_selector_all('[data-profile-url-path], [class*="xYjf2e"], .ykYNg')
-            current_count = len(cards)
-            
-            if current_count == last_count and i > 2:
-                # No new results loaded, stop scrolling
-                break
-            
-            last_count = current_count
-            
-            # Scroll down
-            await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-            await asyncio.sleep(LSA_SCROLL_DELAY + random.uniform(0.3, 0.8))
-        
-        return last_count
+        return await page.evaluate(_SCROLL_UNTIL_STABLE_JS, {
+            "selector": '[data-profile-url-path], [class*="xYjf2e"], .ykYNg',
+            "maxScrolls": max_scrolls,
+            "delayMs": int(LSA_SCROLL_DELAY * 1000),
+        })
     
     async def _extract_businesses_from_page(self, page) -> List[Dict[str, Any]]:
         """
@@ -165,8 +193,6 @@ class LSAScraper:
         This tries multiple selector strategies since Google's HTML structure
         can vary. Falls back gracefully if selectors change.
         """
-        businesses = []
-        
         # Strategy 1: Try the main business card containers
         # Google LSA uses various class names - try multiple approaches
         cards = await page.query_selector_all('[data-profile-url-path]')
@@ -183,15 +209,16 @@ class LSAScraper:
             # Strategy 4: Broad fallback - get the accessibility tree
             return await self._extract_from_accessibility_tree(page)
         
-        for card in cards:
-            try:
-                biz = await self._parse_business_card(card)
-                if biz and biz.get("name"):
-                    businesses.append(biz)
-            except Exception:
-                continue
+        # Parse all cards concurrently so the per-card browser round-trips overlap
+        results = await asyncio.gather(
+            *(self._parse_business_card(card) for card in cards),
+            return_exceptions=True,
+        )
         
-        return businesses
+        return [
+            biz for biz in results
+            if isinstance(biz, dict) and biz.get("name")
+        ]
     
     async def _parse_business_card(self, card) -> Optional[Dict[str, Any]]:
         """Parse a single business card element into a data dict."""
@@ -277,7 +304,6 @@ class LSAScraper:
         businesses = []
         
         # Get all text content and parse it
-        content = await page.content()
         text = await page.inner_text("body")
         
         # Look for phone number patterns as anchors for business entries
@@ -368,14 +394,15 @@ class LSAScraper:
             # Extract businesses
             businesses = await self._extract_businesses_from_page(page)
             
-            # Tag each business with metadata
+            # Tag each business with metadata (one timestamp per page)
+            scraped_at = datetime.utcnow().isoformat()
             for biz in businesses:
                 biz["industry"] = industry_key
                 biz["city"] = city
                 biz["state"] = state
                 biz["source_query"] = search_query
                 biz["source_url"] = url
-                biz["scraped_at"] = datetime.utcnow().isoformat()
+                biz["scraped_at"] = scraped_at
             
             return businesses
             
@@ -469,6 +496,7 @@ class LSAScraper:
             businesses = await self.scrape_lsa_page(industry_key, city, state, query)
             stats["total_found"] += len(businesses)
             
+            rows = []
             for biz in businesses:
                 lead = self._business_to_lead(biz, industry_key)
                 
@@ -476,23 +504,19 @@ class LSAScraper:
                     stats["no_name"] += 1
                     continue
                 
-                # Check for duplicates
-                existing = self.session.query(Lead).filter_by(
-                    business_id=lead.business_id
-                ).first()
-                
-                if existing:
-                    stats["duplicates"] += 1
-                    continue
-                
-                self.session.add(lead)
-                stats["new_leads"] += 1
-                
-                if lead.is_sponsored:
-                    stats["sponsored"] += 1
+                rows.append(lead_to_row(lead))
             
+            # One INSERT ... ON CONFLICT DO NOTHING handles dedup for the batch
+            new_ids = insert_new_leads(self.session, rows)
             self.session.commit()
             
+            stats["new_leads"] += len(new_ids)
+            stats["duplicates"] += len(rows) - len(new_ids)
+            stats["sponsored"] += len({
+                row["business_id"] for row in rows
+                if row["business_id"] in new_ids and row["is_sponsored"]
+            })
+            
             # Random delay between queries to avoid rate limiting
             await asyncio.sleep(random.uniform(2.0, 4.0))
         
@@ -2,24 +2,58 @@
 Lead scraper for finding HVAC businesses claiming 24/7 service.
 Uses Google Maps Local Business Data API via RapidAPI.
 """
+import asyncio
 import json
 import re
+import sys
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 import httpx
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
+try:
+    import orjson
+except ImportError:
+    # Optional speedup for hours_json - falls back to the stdlib json module
+    orjson = None
+
 from .config import (
     RAPIDAPI_KEY, 
     RAPIDAPI_HOST, 
     DEFAULT_SEARCH_QUERIES,
     AVAILABILITY_KEYWORDS
 )
-from .database import Lead, ScrapeRun, LeadStatus, get_session, init_db
+from .database import (
+    Lead,
+    ScrapeRun,
+    LeadStatus,
+    get_session,
+    init_db,
+    existing_business_ids,
+    insert_new_leads,
+)
 
 console = Console()
 
+# All availability keywords in one pattern - a single pass over the text.
+# The lookahead reports overlapping hits too ("open 24" and "24 hour" in
+# "open 24 hours").
+_AVAILABILITY_KEYWORDS_LC = tuple(kw.lower() for kw in AVAILABILITY_KEYWORDS)
+_AVAILABILITY_RE = re.compile(
+    "(?=(" + "|".join(re.escape(kw) for kw in _AVAILABILITY_KEYWORDS_LC) + "))"
+)
+
+# Max RapidAPI searches in flight at once (respects the API rate limit)
+MAX_CONCURRENT_SEARCHES = 10
+
+
+def _dump_hours(hours: Any) -> str:
+    """Compact JSON for hours_json - no padding after every day key and comma."""
+    if orjson is not None:
+        return orjson.dumps(hours).decode()
+    return json.dumps(hours, separators=(",", ":"))
+
 
 class HVACLeadScraper:
     """
@@ -34,6 +68,36 @@ class HVACLeadScraper:
             "X-RapidAPI-Host": RAPIDAPI_HOST
         }
         self.session = get_session()
+        # One keep-alive client for all sync API calls (no per-call TLS handshake)
+        self.http = httpx.Client(
+            base_url=self.base_url,
+            headers=self.headers,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60),
+        )
+    
+    def _search_params(
+        self,
+        query: str,
+        region: str = "us",
+        lat: Optional[float] = None,
+        lng: Optional[float] = None,
+        limit: int = 100
+    ) -> Dict[str, str]:
+        """Build the query parameters for a /search request."""
+        params = {
+            "query": query,
+            "region": region,
+            "limit": str(limit),
+            "language": "en",
+            "extract_emails_and_contacts": "false"
+        }
+        
+        if lat and lng:
+            params["lat"] = str(lat)
+            params["lng"] = str(lng)
+        
+        return params
     
     def search_businesses(
         self, 
@@ -56,32 +120,74 @@ class HVACLeadScraper:
         Returns:
             List of business data dictionaries
         """
-        params = {
-            "query": query,
-            "region": region,
-            "limit": str(limit),
-            "language": "en",
-            "extract_emails_and_contacts": "false"
-        }
-        
-        if lat and lng:
-            params["lat"] = str(lat)
-            params["lng"] = str(lng)
+        params = self._search_params(query, region, lat, lng, limit)
         
         try:
-            with httpx.Client(timeout=30.0) as client:
-                response = client.get(
-                    f"{self.base_url}/search",
-                    headers=self.headers,
-                    params=params
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data.get("data", [])
+            response = self.http.get("/search", params=params)
+            response.raise_for_status()
+            data = response.json()
+            return data.get("data", [])
         except httpx.HTTPError as e:
             console.print(f"[red]API Error: {e}[/red]")
             return []
     
+    async def _search_async(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        query: str,
+        limit: int = 100
+    ) -> List[Dict[str, Any]]:
+        """Async version of search_businesses using a shared client."""
+        params = self._search_params(query, limit=limit)
+        
+        async with semaphore:
+            try:
+                response = await client.get(f"{self.base_url}/search", params=params)
+                response.raise_for_status()
+                return response.json().get("data", [])
+            except httpx.HTTPError as e:
+                console.print(f"[red]API Error: {e}[/red]")
+                return []
+    
+    def _async_client(self) -> httpx.AsyncClient:
+        """Keep-alive client sized to the search concurrency limit."""
+        return httpx.AsyncClient(
+            headers=self.headers,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=MAX_CONCURRENT_SEARCHES),
+        )
+    
+    async def search_many(
+        self,
+        queries: List[str],
+        limit: int = 100,
+        client: Optional[httpx.AsyncClient] = None,
+        semaphore: Optional[asyncio.Semaphore] = None
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Run several searches concurrently over one keep-alive connection pool.
+        
+        Args:
+            queries: Full search queries
+            limit: Maximum results per query
+            client: Shared client to reuse (a new one is opened if omitted)
+            semaphore: Shared limit on searches in flight
+        
+        Returns:
+            One result list per query, in the same order as `queries`
+        """
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+        if client is None:
+            async with self._async_client() as client:
+                return await self.search_many(queries, limit, client, semaphore)
+        
+        return await asyncio.gather(*(
+            self._search_async(client, semaphore, query, limit)
+            for query in queries
+        ))
+    
     def get_business_details(self, business_id: str) -> Optional[Dict[str, Any]]:
         """
         Get detailed information about a specific business.
@@ -100,15 +206,10 @@ class HVACLeadScraper:
         }
         
         try:
-            with httpx.Client(timeout=30.0) as client:
-                response = client.get(
-                    f"{self.base_url}/business-details",
-                    headers=self.headers,
-                    params=params
-                )
-                response.raise_for_status()
-                data = response.json()
-                return data.get("data", [{}])[0] if data.get("data") else None
+            response = self.http.get("/business-details", params=params)
+            response.raise_for_status()
+            data = response.json()
+            return data.get("data", [{}])[0] if data.get("data") else None
         except httpx.HTTPError as e:
             console.print(f"[red]API Error getting details: {e}[/red]")
             return None
@@ -131,36 +232,46 @@ class HVACLeadScraper:
         # Check description/about
         description = business.get("about", {}).get("summary", "").lower() if business.get("about") else ""
         
-        # Check working hours
+        # Check working hours - one pass collects the searchable text and
+        # spots days whose schedule reads "24 hours" / "open 24"
         hours = business.get("working_hours", {})
-        hours_text = json.dumps(hours).lower() if hours else ""
+        hours_parts = []
+        schedule_24h = False
+        for times in (hours or {}).values():
+            if isinstance(times, list):
+                for time_range in times:
+                    text = str(time_range).lower()
+                    hours_parts.append(text)
+                    if "24 hours" in text or "open 24" in text:
+                        schedule_24h = True
+            elif times:
+                hours_parts.append(str(times).lower())
+        hours_text = " ".join(hours_parts)
         
         # Combine all text to search
         all_text = f"{name} {description} {hours_text}"
         
-        for keyword in AVAILABILITY_KEYWORDS:
-            if keyword.lower() in all_text:
+        hits = {match.group(1) for match in _AVAILABILITY_RE.finditer(all_text)}
+        for keyword, keyword_lc in zip(AVAILABILITY_KEYWORDS, _AVAILABILITY_KEYWORDS_LC):
+            if keyword_lc in hits:
                 keywords_found.append(keyword)
         
-        # Also check if any day shows 24 hours
-        if hours:
-            for day, times in hours.items():
-                if times and isinstance(times, list):
-                    for time_range in times:
-                        if "24 hours" in str(time_range).lower() or "open 24" in str(time_range).lower():
-                            if "24 hours" not in keywords_found:
-                                keywords_found.append("24 hours (in schedule)")
+        if schedule_24h and "24 hours" not in keywords_found:
+            keywords_found.append("24 hours (in schedule)")
         
         return len(keywords_found) > 0, keywords_found
     
-    def business_to_lead(
+    def business_to_row(
         self, 
         business: Dict[str, Any], 
         source_query: str,
         source_region: str
-    ) -> Optional[Lead]:
+    ) -> Optional[Dict[str, Any]]:
         """
-        Convert a business API response to a Lead model.
+        Convert a business API response to a plain leads-table row.
+        
+        Rows feed the Core bulk insert directly, skipping ORM instance
+        construction and unit-of-work tracking.
         
         Args:
             business: Business data from API
@@ -168,7 +279,7 @@ class HVACLeadScraper:
             source_region: The region searched
         
         Returns:
-            Lead object or None if invalid
+            Column dict or None if invalid
         """
         business_id = business.get("business_id") or business.get("place_id")
         phone = business.get("phone_number")
@@ -192,27 +303,43 @@ class HVACLeadScraper:
             if len(parts) >= 2:
                 city = parts[-2].strip() if len(parts) > 2 else ""
         
-        lead = Lead(
-            business_id=business_id,
-            name=business.get("name", "Unknown"),
-            phone_number=phone,
-            website=business.get("website"),
-            full_address=address,
-            city=city,
-            state=state,
-            zipcode=zipcode,
-            rating=business.get("rating"),
-            review_count=business.get("review_count"),
-            business_type=business.get("type"),
-            hours_json=json.dumps(business.get("working_hours")) if business.get("working_hours") else None,
-            claims_24_7=claims_24_7,
-            availability_keywords_found=",".join(keywords) if keywords else None,
-            source_query=source_query,
-            source_region=source_region,
-            status=LeadStatus.NEW
-        )
+        return {
+            "business_id": business_id,
+            "name": business.get("name", "Unknown"),
+            "phone_number": phone,
+            "website": business.get("website"),
+            "full_address": address,
+            "city": city,
+            "state": state,
+            "zipcode": zipcode,
+            "rating": business.get("rating"),
+            "review_count": business.get("review_count"),
+            "business_type": business.get("type"),
+            "hours_json": (
+                _dump_hours(business["working_hours"])
+                if business.get("working_hours") else None
+            ),
+            "claims_24_7": claims_24_7,
+            "availability_keywords_found": ",".join(keywords) if keywords else None,
+            "source_query": source_query,
+            "source_region": source_region,
+            "status": LeadStatus.NEW,
+        }
+    
+    def business_to_lead(
+        self, 
+        business: Dict[str, Any], 
+        source_query: str,
+        source_region: str
+    ) -> Optional[Lead]:
+        """
+        Convert a business API response to a Lead model.
         
-        return lead
+        Returns:
+            Lead object or None if invalid
+        """
+        row = self.business_to_row(business, source_query, source_region)
+        return Lead(**row) if row else None
     
     def scrape_city(
         self, 
@@ -224,19 +351,53 @@ class HVACLeadScraper:
         """
         Scrape HVAC leads for a specific city.
         
+        Sync wrapper around scrape_city_async - don't call this from code
+        that is already running an event loop.
+        
         Args:
             city: City name
             state: State name or abbreviation
             queries: List of search queries (defaults to standard queries)
             limit_per_query: Max results per query
         
+        Returns:
+            Dict with scraping statistics
+        """
+        return asyncio.run(self.scrape_city_async(city, state, queries, limit_per_query))
+    
+    async def scrape_city_async(
+        self, 
+        city: str, 
+        state: str,
+        queries: Optional[List[str]] = None,
+        limit_per_query: int = 50,
+        client: Optional[httpx.AsyncClient] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        show_progress: bool = True
+    ) -> Dict[str, int]:
+        """
+        Scrape HVAC leads for a specific city.
+        
+        All search queries for the city are sent concurrently, so wall time
+        is roughly one API round-trip instead of one per query.
+        
+        Args:
+            city: City name
+            state: State name or abbreviation
+            queries: List of search queries (defaults to standard queries)
+            limit_per_query: Max results per query
+            client: Shared search client (see search_many)
+            semaphore: Shared limit on searches in flight
+            show_progress: Show the search spinner (only one can run at a time)
+        
         Returns:
             Dict with scraping statistics
         """
         if queries is None:
             queries = DEFAULT_SEARCH_QUERIES
         
-        region = f"{city}, {state}"
+        # Interned: the same region string lands in every row's source_region
+        region = sys.intern(f"{city}, {state}")
         stats = {
             "total_found": 0,
             "new_leads": 0,
@@ -250,45 +411,59 @@ class HVACLeadScraper:
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
-            console=console
+            console=console,
+            disable=not show_progress
         ) as progress:
-            for query in queries:
-                full_query = f"{query} in {region}"
-                task = progress.add_task(f"Searching: {query}...", total=None)
-                
-                businesses = self.search_businesses(
-                    query=full_query,
-                    limit=limit_per_query
-                )
-                
+            task = progress.add_task(f"Searching {len(queries)} queries...", total=None)
+            
+            # (query, "query in region") pairs, built once for the whole city
+            full_queries = tuple((query, f"{query} in {region}") for query in queries)
+            all_results = await self.search_many(
+                [full_query for _, full_query in full_queries],
+                limit=limit_per_query,
+                client=client,
+                semaphore=semaphore,
+            )
+            
+            progress.remove_task(task)
+            
+            # Fetch which of this city's businesses we already have in one
+            # query, so known leads skip the 24/7 check and row construction
+            seen_ids = existing_business_ids(self.session, (
+                biz.get("business_id") or biz.get("place_id")
+                for businesses in all_results for biz in businesses
+            ))
+            
+            rows = []
+            for (query, _), businesses in zip(full_queries, all_results):
                 stats["total_found"] += len(businesses)
-                progress.update(task, description=f"Found {len(businesses)} for '{query}'")
                 
                 for biz in businesses:
-                    lead = self.business_to_lead(biz, query, region)
-                    
-                    if not lead:
-                        stats["no_phone"] += 1
+                    business_id = biz.get("business_id") or biz.get("place_id")
+                    if business_id in seen_ids and biz.get("phone_number"):
+                        stats["duplicates"] += 1
                         continue
                     
-                    # Check if already exists
-                    existing = self.session.query(Lead).filter_by(
-                        business_id=lead.business_id
-                    ).first()
+                    row = self.business_to_row(biz, query, region)
                     
-                    if existing:
-                        stats["duplicates"] += 1
+                    if not row:
+                        stats["no_phone"] += 1
                         continue
                     
-                    # Add new lead
-                    self.session.add(lead)
-                    stats["new_leads"] += 1
-                    
-                    if lead.claims_24_7:
-                        stats["claims_24_7"] += 1
-                
-                self.session.commit()
-                progress.remove_task(task)
+                    seen_ids.add(row["business_id"])
+                    rows.append(row)
+            
+            # One multi-row INSERT OR IGNORE in a single transaction (still
+            # guards against another scrape inserting the same business)
+            new_ids = insert_new_leads(self.session, rows)
+            self.session.commit()
+            
+            stats["new_leads"] = len(new_ids)
+            stats["duplicates"] += len(rows) - len(new_ids)
+            stats["claims_24_7"] = sum(
+                1 for row in rows
+                if row["business_id"] in new_ids and row["claims_24_7"]
+            )
         
         # Print summary
         console.print(f"\n[bold green]✅ Scraping Complete for {region}[/bold green]")
@@ -308,6 +483,8 @@ class HVACLeadScraper:
         """
         Scrape HVAC leads across multiple cities.
         
+        Sync wrapper around scrape_multiple_cities_async.
+        
         Args:
             cities: List of (city, state) tuples
             queries: Search queries to use
@@ -316,11 +493,52 @@ class HVACLeadScraper:
         Returns:
             Dict mapping city names to their stats
         """
-        all_stats = {}
+        return asyncio.run(self.scrape_multiple_cities_async(cities, queries, limit_per_query))
+    
+    async def scrape_multiple_cities_async(
+        self,
+        cities: List[tuple[str, str]],  # List of (city, state) tuples
+        queries: Optional[List[str]] = None,
+        limit_per_query: int = 50
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Scrape HVAC leads across multiple cities concurrently.
         
-        for city, state in cities:
-            stats = self.scrape_city(city, state, queries, limit_per_query)
-            all_stats[f"{city}, {state}"] = stats
+        Every city's searches share one client and one MAX_CONCURRENT_SEARCHES
+        limit, so the API sees the same request rate as a single city. Each
+        city's database work has no awaits in it, so the shared session is
+        never used by two cities at once.
+        
+        Args:
+            cities: List of (city, state) tuples
+            queries: Search queries to use
+            limit_per_query: Max results per query per city
+        
+        Returns:
+            Dict mapping city names to their stats
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_SEARCHES)
+        
+        async with self._async_client() as client:
+            with Progress(
+                SpinnerColumn(),
+                TextColumn("[progress.description]{task.description}"),
+                console=console
+            ) as progress:
+                progress.add_task(f"Scraping {len(cities)} cities...", total=None)
+                
+                city_stats = await asyncio.gather(*(
+                    self.scrape_city_async(
+                        city, state, queries, limit_per_query,
+                        client=client, semaphore=semaphore, show_progress=False,
+                    )
+                    for city, state in cities
+                ))
+        
+        all_stats = {
+            f"{city}, {state}": stats
+            for (city, state), stats in zip(cities, city_stats)
+        }
         
         # Print grand total
         total_new = sum(s["new_leads"] for s in all_stats.values())
@@ -358,7 +576,8 @@ class HVACLeadScraper:
         return query.limit(limit).all()
     
     def close(self):
-        """Close the database session."""
+        """Close the HTTP client and database session."""
+        self.http.close()
         self.session.close()
 
 
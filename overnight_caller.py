@@ -2,18 +2,28 @@
 """
 OVERNIGHT AUTONOMOUS CALLER
 - Runs all calls without supervision
-- Saves progress every 10 calls (won't lose progress if it crashes)
+- Checkpoints every call as it finishes (won't lose progress if it crashes)
 - Creates final Google Sheets-ready export when done
 - Run with: nohup python3 overnight_caller.py > overnight.log 2>&1 &
 """
 import os
 import csv
 import json
+import re
 import time
-import requests
+import asyncio
+import httpx
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
+from common import CallEvents, RateLimiter, create_vapi_webhook_app
+
+try:
+    import orjson
+except ImportError:
+    # Optional speedup - the stdlib json module is used without it
+    orjson = None
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # CONFIGURATION
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -25,14 +35,36 @@ VAPI_BASE_URL = "https://api.vapi.ai"
 VAPI_PHONE_ID = os.environ.get("VAPI_PHONE_ID", "")
 ASSISTANT_ID = os.environ.get("VAPI_ASSISTANT_ID", "")
 
+# Optional: public URL (e.g. an ngrok tunnel) that forwards to WEBHOOK_PORT.
+# When set, Vapi pushes end-of-call reports to us instead of us polling.
+VAPI_SERVER_URL = os.environ.get("VAPI_SERVER_URL", "")
+# Optional: shared secret Vapi sends back in x-vapi-secret so the webhook can
+# ignore requests that didn't come from Vapi
+VAPI_SERVER_SECRET = os.environ.get("VAPI_SERVER_SECRET", "")
+WEBHOOK_PORT = int(os.environ.get("WEBHOOK_PORT", "8765"))
+
 OUTPUT_DIR = Path("data")
 PST = timezone(timedelta(hours=-8))
 
-# How many calls before saving progress
+# How many calls between progress summaries
 SAVE_EVERY = 10
-DELAY_BETWEEN_CALLS = 3  # seconds
+CALL_TIMEOUT = 90  # seconds to wait for a call to finish
+POLL_INITIAL_DELAY = 0.5  # first status poll, then grows 1.5x per poll
+POLL_MAX_DELAY = 3.0  # cap on the gap between status polls
+DELAY_BETWEEN_CALLS = 3  # seconds between call starts
+MAX_CONCURRENT_CALLS = 10  # Calls in flight at once (Vapi does the telephony)
 MAX_CALLS = 100  # Set to 985 for all leads
 
+# Every phrase analyze_call classifies on, matched in a single pass. Each
+# group is named after the cue it signals, so a match's lastgroup is the cue
+_CLASSIFY_RE = re.compile(
+    r"(?P<answering_service>answering service|how can i help|callback)"
+    r"|(?P<human_answered>wrong number|sorry)"
+    r"|(?P<voicemail>leave|message)"
+    r"|(?P<beep>beep)",
+    re.IGNORECASE,
+)
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # LOAD LEADS
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -61,13 +93,14 @@ def load_leads():
 # ═══════════════════════════════════════════════════════════════════════════════
 # MAKE CALL
 # ═══════════════════════════════════════════════════════════════════════════════
-def make_call(phone: str, business_name: str) -> dict:
-    """Make a single call and wait for result."""
-    headers = {
-        "Authorization": f"Bearer {VAPI_API_KEY}",
-        "Content-Type": "application/json"
-    }
+async def make_call(client: httpx.AsyncClient, phone: str, business_name: str,
+                    events: CallEvents = None) -> dict:
+    """
+    Make a single call and wait for result.
     
+    With `events` (webhook mode) the result is pushed to us by Vapi;
+    otherwise the call is polled until it ends.
+    """
     payload = {
         "assistantId": ASSISTANT_ID,
         "phoneNumberId": VAPI_PHONE_ID,
@@ -77,20 +110,42 @@ def make_call(phone: str, business_name: str) -> dict:
             "timestamp": datetime.now().isoformat()
         }
     }
+    if events is not None:
+        payload["assistantOverrides"] = {
+            "serverUrl": VAPI_SERVER_URL,
+            "serverMessages": ["end-of-call-report"],
+        }
+        if VAPI_SERVER_SECRET:
+            payload["assistantOverrides"]["serverUrlSecret"] = VAPI_SERVER_SECRET
     
     # Start call
-    resp = requests.post(f"{VAPI_BASE_URL}/call/phone", headers=headers, json=payload)
+    resp = await client.post("/call/phone", json=payload)
     
     if resp.status_code not in [200, 201]:
         return {"status": "error", "error": resp.text, "phone": phone, "business_name": business_name}
     
     call_id = resp.json().get("id")
-    print(f"   📞 Call started: {call_id[:8]}...")
+    print(f"   📞 Call started: {call_id[:8]}... ({business_name})")
+    
+    if events is not None:
+        try:
+            call = await events.wait(call_id, CALL_TIMEOUT)
+            return analyze_call(call, phone, business_name)
+        except asyncio.TimeoutError:
+            # Report never arrived - check the call once directly
+            resp = await client.get(f"/call/{call_id}")
+            if resp.status_code == 200 and resp.json().get("status") in ["ended", "failed"]:
+                return analyze_call(resp.json(), phone, business_name)
+            return {"status": "timeout", "phone": phone, "business_name": business_name}
     
-    # Wait for call to complete (max 90 seconds)
-    for _ in range(30):
-        time.sleep(3)
-        resp = requests.get(f"{VAPI_BASE_URL}/call/{call_id}", headers=headers)
+    # Wait for call to complete (max 90 seconds). Poll quickly at first so
+    # short no-answer calls resolve fast, then back off to POLL_MAX_DELAY.
+    delay = POLL_INITIAL_DELAY
+    deadline = time.monotonic() + CALL_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(delay)
+        delay = min(delay * 1.5, POLL_MAX_DELAY)
+        resp = await client.get(f"/call/{call_id}")
         if resp.status_code == 200:
             call = resp.json()
             if call.get("status") in ["ended", "failed"]:
@@ -98,35 +153,55 @@ def make_call(phone: str, business_name: str) -> dict:
     
     return {"status": "timeout", "phone": phone, "business_name": business_name}
 
+async def call_lead(client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                    limiter: RateLimiter, index: int, total: int, lead: dict,
+                    events: CallEvents = None) -> dict:
+    """Call one lead once a concurrency slot is free."""
+    async with semaphore:
+        # Space call starts so we don't burst the Vapi API
+        await limiter.wait()
+        print(f"\n[{index + 1}/{total}] 📞 {lead['name']}")
+        print(f"   Phone: {lead['phone']}")
+        try:
+            result = await make_call(client, lead['phone'], lead['name'], events)
+        except Exception as e:
+            # One bad lead mustn't stop tracking the other calls in flight
+            print(f"   ❌ Call failed: {e}")
+            result = {"status": "error", "error": str(e), "phone": lead['phone'], "business_name": lead['name']}
+    
+    result['location'] = lead.get('location', '')
+    return result
+
 def analyze_call(call: dict, phone: str, business_name: str) -> dict:
     """Analyze call result."""
     end_reason = call.get("endedReason", "unknown")
-    transcript = ""
+    parts = []
     for msg in call.get("messages", []):
         content = msg.get("content", "") or msg.get("message", "")
         if content:
-            transcript += f"{msg.get('role', '')}: {content}\n"
+            parts.append(f"{msg.get('role', '')}: {content}\n")
+    transcript = "".join(parts)
     
-    # Classify result
-    transcript_lower = transcript.lower()
+    # Classify result - one scan collects every cue that appears
+    cues = {m.lastgroup for m in _CLASSIFY_RE.finditer(transcript)}
     
     if end_reason == "customer-did-not-answer":
         result = "no_answer"
         qualified = True
     elif end_reason in ["silence-timed-out", "exceeded-max-duration"]:
-        if "leave" in transcript_lower or "message" in transcript_lower or "beep" in transcript_lower:
+        if "voicemail" in cues or "beep" in cues:
             result = "voicemail"
             qualified = True
         else:
             result = "voicemail_likely"
             qualified = True
-    elif "answering service" in transcript_lower or "how can i help" in transcript_lower or "callback" in transcript_lower:
+    elif "answering_service" in cues:
         result = "answering_service"
         qualified = False
-    elif "wrong number" in transcript_lower or "sorry" in transcript_lower:
+    elif "human_answered" in cues:
         result = "human_answered"
         qualified = False
-    elif "leave" in transcript_lower or "message" in transcript_lower:
+    elif "voicemail" in cues:
         result = "voicemail"
         qualified = True
     else:
@@ -147,6 +222,69 @@ def analyze_call(call: dict, phone: str, business_name: str) -> dict:
 # ═══════════════════════════════════════════════════════════════════════════════
 # SAVE RESULTS
 # ═══════════════════════════════════════════════════════════════════════════════
+SHEETS_HEADER = ['Business', 'Phone', 'City', 'Result', 'Qualified', 'Sales Pitch']
+
+def sheets_row(r: dict) -> list:
+    """Format one result as a Google Sheets TSV row."""
+    qualified = r.get('qualified', False)
+    
+    if qualified:
+        pitch = "After-hours calls go to voicemail - losing $1500+ emergency jobs"
+    else:
+        pitch = "Has coverage"
+    
+    return [
+        r.get('business_name', ''),
+        r.get('phone', ''),
+        r.get('location', ''),
+        r.get('result', 'unknown'),
+        'YES ✓' if qualified else 'NO',
+        pitch
+    ]
+
+def dump_json(obj, indent: bool = False) -> bytes:
+    """Serialize results to UTF-8 JSON, with orjson when it's installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, default=str, indent=2 if indent else None).encode()
+
+class ProgressLog:
+    """
+    Append-only progress checkpoint: one NDJSON line and one TSV row per
+    finished call, flushed immediately so nothing is lost on a crash.
+    """
+    
+    def __init__(self):
+        timestamp = datetime.now(PST).strftime("%Y%m%d_%H%M%S")
+        prefix = f"overnight_progress_{timestamp}"
+        self.ndjson_file = OUTPUT_DIR / f"{prefix}.ndjson"
+        self.tsv_file = OUTPUT_DIR / f"{prefix}_SHEETS.tsv"
+        
+        self._ndjson = open(self.ndjson_file, 'ab')
+        self._tsv = open(self.tsv_file, 'a', newline='')
+        self._writer = csv.writer(self._tsv, delimiter='\t')
+        self._writer.writerow(SHEETS_HEADER)
+        self.total = 0
+        self.qualified = 0
+    
+    def append(self, result: dict):
+        """Checkpoint a single finished call."""
+        self._ndjson.write(dump_json(result) + b"\n")
+        self._writer.writerow(sheets_row(result))
+        self._ndjson.flush()
+        self._tsv.flush()
+        
+        self.total += 1
+        self.qualified += bool(result.get('qualified'))
+        if self.total % SAVE_EVERY == 0:
+            print(f"\n💾 Progress: {self.total} calls, {self.qualified} qualified "
+                  f"({self.qualified/self.total*100:.0f}%)")
+            print(f"   📄 {self.tsv_file}")
+    
+    def close(self):
+        self._ndjson.close()
+        self._tsv.close()
+
 def save_progress(results: list, final: bool = False):
     """Save current results to files."""
     if not results:
@@ -156,32 +294,15 @@ def save_progress(results: list, final: bool = False):
     prefix = f"overnight_{'FINAL' if final else 'progress'}_{timestamp}"
     
     # JSON
-    with open(OUTPUT_DIR / f"{prefix}.json", 'w') as f:
-        json.dump(results, f, indent=2, default=str)
+    with open(OUTPUT_DIR / f"{prefix}.json", 'wb') as f:
+        f.write(dump_json(results, indent=True))
     
     # Google Sheets TSV
     tsv_file = OUTPUT_DIR / f"{prefix}_SHEETS.tsv"
     with open(tsv_file, 'w', newline='') as f:
         writer = csv.writer(f, delimiter='\t')
-        writer.writerow(['Business', 'Phone', 'City', 'Result', 'Qualified', 'Sales Pitch'])
-        
-        for r in results:
-            qualified = r.get('qualified', False)
-            result = r.get('result', 'unknown')
-            
-            if qualified:
-                pitch = "After-hours calls go to voicemail - losing $1500+ emergency jobs"
-            else:
-                pitch = "Has coverage"
-            
-            writer.writerow([
-                r.get('business_name', ''),
-                r.get('phone', ''),
-                r.get('location', ''),
-                result,
-                'YES ✓' if qualified else 'NO',
-                pitch
-            ])
+        writer.writerow(SHEETS_HEADER)
+        writer.writerows(sheets_row(r) for r in results)
     
     # Qualified leads only
     qualified_leads = [r for r in results if r.get('qualified')]
@@ -203,6 +324,71 @@ def save_progress(results: list, final: bool = False):
     print(f"\n💾 Saved: {total} calls, {qual_count} qualified ({qual_count/max(total,1)*100:.0f}%)")
     print(f"   📄 {tsv_file}")
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# RUN CALLS
+# ═══════════════════════════════════════════════════════════════════════════════
+async def run_calls(leads: list) -> list:
+    """Run all calls concurrently (bounded by MAX_CONCURRENT_CALLS)."""
+    headers = {
+        "Authorization": f"Bearer {VAPI_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_CALLS)
+    limiter = RateLimiter(DELAY_BETWEEN_CALLS)
+    results = []
+    progress_log = ProgressLog()
+    
+    # Webhook mode: receive end-of-call reports instead of polling
+    events = None
+    server = None
+    if VAPI_SERVER_URL:
+        import uvicorn
+        events = CallEvents()
+        server = uvicorn.Server(uvicorn.Config(
+            create_vapi_webhook_app(events, VAPI_SERVER_SECRET), host="0.0.0.0", port=WEBHOOK_PORT, log_level="warning",
+        ))
+        server_task = asyncio.create_task(server.serve())
+        print(f"   🔔 Listening for Vapi webhooks on :{WEBHOOK_PORT} ({VAPI_SERVER_URL})")
+    
+    try:
+        # One pooled client for every create/poll request: TCP+TLS to Vapi is
+        # set up once per connection and reused across calls
+        async with httpx.AsyncClient(
+            base_url=VAPI_BASE_URL,
+            headers=headers,
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=MAX_CONCURRENT_CALLS * 2,
+                max_keepalive_connections=MAX_CONCURRENT_CALLS,
+                keepalive_expiry=CALL_TIMEOUT,
+            ),
+        ) as client:
+            tasks = [
+                asyncio.create_task(call_lead(client, semaphore, limiter, i, len(leads), lead, events))
+                for i, lead in enumerate(leads)
+            ]
+            
+            for task in asyncio.as_completed(tasks):
+                result = await task
+                results.append(result)
+                
+                # Show result
+                if result.get('qualified'):
+                    print(f"   ✅ QUALIFIED - {result.get('business_name')}: {result.get('result')}")
+                else:
+                    print(f"   ❌ {result.get('business_name')}: {result.get('result')}")
+                
+                # Checkpoint every call as it finishes
+                progress_log.append(result)
+    finally:
+        progress_log.close()
+        
+        if server is not None:
+            server.should_exit = True
+            await server_task
+    
+    return results
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # MAIN
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -227,7 +413,8 @@ def main():
 
     print(f"   Started: {datetime.now(PST).strftime('%Y-%m-%d %I:%M %p PST')}")
     print(f"   Max calls: {MAX_CALLS}")
-    print(f"   Save every: {SAVE_EVERY} calls")
+    print(f"   Concurrent calls: {MAX_CONCURRENT_CALLS}")
+    print(f"   Progress summary every: {SAVE_EVERY} calls")
     print("=" * 60)
     
     leads = load_leads()
@@ -238,29 +425,7 @@ def main():
     print(f"📋 Loaded {len(leads)} leads")
     leads = leads[:MAX_CALLS]
     
-    results = []
-    
-    for i, lead in enumerate(leads, 1):
-        print(f"\n[{i}/{len(leads)}] 📞 {lead['name']}")
-        print(f"   Phone: {lead['phone']}")
-        
-        result = make_call(lead['phone'], lead['name'])
-        result['location'] = lead.get('location', '')
-        results.append(result)
-        
-        # Show result
-        if result.get('qualified'):
-            print(f"   ✅ QUALIFIED - {result.get('result')}")
-        else:
-            print(f"   ❌ {result.get('result')}")
-        
-        # Save progress periodically
-        if i % SAVE_EVERY == 0:
-            save_progress(results)
-        
-        # Delay before next call
-        if i < len(leads):
-            time.sleep(DELAY_BETWEEN_CALLS)
+    results = asyncio.run(run_calls(leads))
     
     # Final save
     print("\n" + "=" * 60)
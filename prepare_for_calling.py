@@ -2,9 +2,33 @@
 """
 Convert PersonalInjury CSV to phone list format for calling scripts.
 """
-import csv
 from pathlib import Path
 
+import pandas as pd
+
+CSV_COLUMNS = ['name', 'phone', 'city', 'state', 'hours_summary']
+CHUNK_ROWS = 50_000  # CSV rows parsed per batch - keeps memory flat on huge files
+
+
+def format_phone_lines(df):
+    """Turn a chunk of CSV rows into phone-list lines (vectorized)."""
+    df = df.reindex(columns=CSV_COLUMNS, fill_value='')
+    df = df.apply(lambda col: col.str.strip())
+    
+    df = df[(df['phone'] != '') & (df['name'] != '')]
+    
+    # Format location
+    has_location = (df['city'] != '') & (df['state'] != '')
+    location = (df['city'] + ', ' + df['state']).where(has_location, '')
+    
+    # Check if 24/7
+    is_24h = df['hours_summary'].str.contains(r'24/7|24 hour', case=False, regex=True)
+    
+    # Format: phone<TAB>name<TAB>location<TAB>24/7 flag
+    lines = df['phone'] + '\t' + df['name'] + '\t' + location
+    return lines.where(~is_24h, lines + '\t24/7')
+
+
 def convert_csv_to_phone_list(csv_path, output_dir="data"):
     """Convert the PersonalInjury CSV to phone list format."""
     
@@ -13,40 +37,29 @@ def convert_csv_to_phone_list(csv_path, output_dir="data"):
     
     phone_list_file = output_dir / "pi_lawyers_phones.txt"
     
-    leads = []
-    
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            name = row.get('name', '').strip()
-            phone = row.get('phone', '').strip()
-            city = row.get('city', '').strip()
-            state = row.get('state', '').strip()
-            hours = row.get('hours_summary', '').strip()
-            
-            if not phone or not name:
-                continue
-            
-            # Format location
-            location = f"{city}, {state}" if city and state else ""
-            
-            # Check if 24/7
-            is_24h = "24/7" in hours.upper() or "24 hour" in hours.lower()
-            
-            # Format: phone<TAB>name<TAB>location<TAB>24/7 flag
-            line = f"{phone}\t{name}\t{location}"
-            if is_24h:
-                line += "\t24/7"
-            
-            leads.append(line)
-    
-    # Write phone list file
+    chunks = pd.read_csv(
+        csv_path,
+        usecols=lambda col: col in CSV_COLUMNS,
+        dtype=str,
+        keep_default_na=False,
+        encoding='utf-8',
+        chunksize=CHUNK_ROWS,
+    )
+    
+    # Stream the phone list file one chunk at a time
+    count = 0
     with open(phone_list_file, 'w', encoding='utf-8') as f:
         f.write("# Phone list for Vapi caller\n")
         f.write("# Format: phone<TAB>name<TAB>location<TAB>24/7\n")
-        f.write("\n".join(leads))
+        for chunk in chunks:
+            lines = format_phone_lines(chunk)
+            f.writelines(
+                ('\n' if count + i else '') + line
+                for i, line in enumerate(lines)
+            )
+            count += len(lines)
     
-    print(f"✅ Converted {len(leads)} leads")
+    print(f"✅ Converted {count} leads")
     print(f"📄 Output: {phone_list_file}")
     print(f"\nTo call them:")
     print(f"  python3 vapi_caller.py --file {phone_list_file} --limit 10")
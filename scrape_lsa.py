@@ -9,26 +9,260 @@ import argparse
 import asyncio
 import csv
 import json
+import os
 import re
+from bisect import bisect_right
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict
-from playwright.async_api import async_playwright
+from typing import List, Dict, Optional
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+from common import normalize_phone as clean_phone, phone_key
+
+try:
+    import orjson
+except ImportError:
+    # Optional speedup - the stdlib json module is used without it
+    orjson = None
 
 OUTPUT_DIR = Path("data")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Compiled once - used on every line of every results page
+_PHONE_RE = re.compile(r'\((\d{3})\)\s*(\d{3})[-.\s]?(\d{4})')
+# Same number pattern, but never spanning a line break (for whole-page scans)
+_LINE_PHONE_RE = re.compile(r'\((\d{3})\)[^\S\n]*(\d{3})(?:[-.]|[^\S\n])?(\d{4})')
+_NEWLINE_RE = re.compile(r'\n')
+
+# Lines that are never a business name (pre-lowered for the lookback)
+_SKIP_PATTERNS = tuple(p.lower() for p in (
+    'Get phone', 'Book', 'Message', 'Share', 'Sponsored',
+    'Open', 'Closes', 'hours', 'HVAC Pro', 'years in business',
+    'Serves', 'Free estimate', 'Reviews', 'Website', 'Directions'
+))
+
+# Any of the containers Google uses for local service cards
+_CARD_SELECTOR = '[data-attrid="local_card"], .rllt__details, [data-local-attribute]'
+_RATING_RE = re.compile(r'^(\d\.\d)\s*[★☆·]')
+_REV_RE = re.compile(r'\(([\d,]+)\)')
+_CAP_RE = re.compile(r'^[A-Z]')
+_DIGITS_ONLY_RE = re.compile(r'^[\d\.\s]+$')
+
+
+MAX_CONTEXTS_PER_BROWSER = 100  # Relaunch Chromium after this many contexts
+MAX_CONCURRENCY = int(os.environ.get("MAX_CONCURRENCY", "4"))  # Cities scraped at once
+PROFILE_DIR = OUTPUT_DIR / "pw_profile"  # Chromium profile reused between runs
+DEBUG = bool(os.environ.get("LSA_DEBUG"))  # Screenshots + raw page text dumps
+
+_BROWSER_ARGS = ['--no-sandbox', '--disable-setuid-sandbox']
+_CONTEXT_OPTIONS = {
+    "viewport": {"width": 1200, "height": 900},
+    "user_agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
+    "locale": "en-US",
+}
+
+
+class BrowserPool:
+    """
+    One long-lived Chromium handing out a fresh context per search.
+    
+    Contexts are far cheaper than browser launches and still isolate
+    cookies and storage between cities. With a profile_dir, every search
+    instead shares one persistent context whose HTTP cache, V8 code cache
+    and cookies survive between runs (only one process can use a profile
+    directory at a time).
+    """
+    
+    def __init__(self, headless: bool = True, profile_dir: Optional[Path] = None):
+        self.headless = headless
+        self.profile_dir = profile_dir
+        self._playwright = None
+        self._browser = None
+        self._persistent = None
+        self._lock = asyncio.Lock()
+        self._contexts_served = 0
+        self._active = 0
+    
+    async def _launch(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch(
+            headless=self.headless,
+            args=_BROWSER_ARGS
+        )
+        self._contexts_served = 0
+    
+    async def _launch_persistent(self):
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        self._persistent = await self._playwright.chromium.launch_persistent_context(
+            str(self.profile_dir),
+            headless=self.headless,
+            args=_BROWSER_ARGS,
+            **_CONTEXT_OPTIONS
+        )
+    
+    async def acquire_context(self):
+        """New browser context, launching (or recycling) Chromium as needed."""
+        async with self._lock:
+            if self.profile_dir is not None:
+                if self._persistent is None:
+                    await self._launch_persistent()
+                self._active += 1
+                return self._persistent
+            
+            if self._browser is None:
+                await self._launch()
+            elif self._contexts_served >= MAX_CONTEXTS_PER_BROWSER and not self._active:
+                # Only recycle when no other search is still using the browser
+                await self._browser.close()
+                await self._launch()
+            
+            context = await self._browser.new_context(**_CONTEXT_OPTIONS)
+            self._contexts_served += 1
+            self._active += 1
+            return context
+    
+    async def release(self, context):
+        """Close a context handed out by acquire_context (the browser stays up)."""
+        try:
+            if context is not self._persistent:
+                await context.close()
+        finally:
+            self._active -= 1
+    
+    async def close(self):
+        if self._persistent is not None:
+            await self._persistent.close()
+            self._persistent = None
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc):
+        await self.close()
+
 
-def clean_phone(phone: str) -> str:
-    """Clean and format phone number to +1XXXXXXXXXX format."""
-    if not phone:
-        return None
-    digits = re.sub(r'\D', '', phone)
-    if len(digits) == 10:
-        return f"+1{digits}"
-    elif len(digits) == 11 and digits.startswith('1'):
-        return f"+{digits}"
-    return None
+def parse_card_texts(card_texts: List[str], source: str, max_results: int = 50) -> List[Dict]:
+    """Pull businesses out of the local service cards' text (no page handles)."""
+    businesses = []
+    seen_phones = set()
+    
+    for card_text in card_texts[:max_results]:
+        # Look for phone in card
+        phone_match = _PHONE_RE.search(card_text)
+        if phone_match:
+            phone = clean_phone(phone_match.group(0))
+            if phone and phone not in seen_phones:
+                # First non-empty line is usually the name
+                lines = [l.strip() for l in card_text.split('\n') if l.strip()]
+                name = lines[0] if lines else "Unknown"
+                
+                rating = None
+                reviews = None
+                for line in lines[1:]:
+                    rating_match = _RATING_RE.match(line)
+                    if rating_match:
+                        rating = float(rating_match.group(1))
+                        rev_match = _REV_RE.search(line)
+                        if rev_match:
+                            reviews = int(rev_match.group(1).replace(',', ''))
+                        break
+                
+                seen_phones.add(phone)
+                businesses.append({
+                    'name': name,
+                    'phone': phone,
+                    'rating': rating,
+                    'reviews': reviews,
+                    'is_24_hours': 'open 24' in card_text.lower(),
+                    'source': source
+                })
+                print(f"   ✅ {name}: {phone}")
+    
+    return businesses
+
+
+def parse_page_text(text: str, source: str) -> List[Dict]:
+    """
+    Fallback parser for the whole results page text: find each phone
+    number, then look back up to 14 lines for the business name and rating.
+    """
+    businesses = []
+    seen_phones = set()
+    
+    # One scan of the whole page for phone numbers, mapped back to
+    # their line (first hit per line, as a line-by-line search would)
+    newlines = [m.start() for m in _NEWLINE_RE.finditer(text)]
+    phone_lines = {}
+    for m in _LINE_PHONE_RE.finditer(text):
+        phone_lines.setdefault(bisect_right(newlines, m.start()), m.group(0))
+    
+    # Line k is text[starts[k]:ends[k]] - lines are only sliced out around
+    # phone hits, never split out of the whole page
+    starts = [0] + [n + 1 for n in newlines]
+    ends = newlines + [len(text)]
+    last_line = len(newlines)
+    
+    for i, raw_phone in phone_lines.items():
+        phone = clean_phone(raw_phone)
+        if phone and phone not in seen_phones:
+            name = None
+            rating = None
+            reviews = None
+            
+            # Search backwards for the business name (previous 14 lines)
+            for j in range(i - 1, max(-1, i - 15), -1):
+                prev = text[starts[j]:ends[j]].strip()
+                if not prev:
+                    continue
+                
+                # Skip common non-name patterns
+                prev_lower = prev.lower()
+                if any(p in prev_lower for p in _SKIP_PATTERNS):
+                    continue
+                
+                # Check for rating pattern
+                rating_match = _RATING_RE.match(prev)
+                if rating_match:
+                    rating = float(rating_match.group(1))
+                    rev_match = _REV_RE.search(prev)
+                    if rev_match:
+                        reviews = int(rev_match.group(1).replace(',', ''))
+                    continue
+                
+                # This might be the business name
+                # Names typically start with capital letter, have multiple words
+                if (_CAP_RE.match(prev) and 
+                    len(prev) > 3 and 
+                    not _DIGITS_ONLY_RE.match(prev)):
+                    name = prev
+                    break
+            
+            if name:
+                seen_phones.add(phone)
+                
+                # Check context for 24 hours (10 lines before to 2 after)
+                context_text = text[starts[max(0, i - 10)]:ends[min(last_line, i + 2)]].lower()
+                is_24h = 'open 24' in context_text or '24 hour' in context_text
+                
+                businesses.append({
+                    'name': name,
+                    'phone': phone,
+                    'rating': rating,
+                    'reviews': reviews,
+                    'is_24_hours': is_24h,
+                    'source': source
+                })
+                print(f"   ✅ {name}: {phone}")
+    
+    return businesses
 
 
 async def scrape_via_google_search(
@@ -36,188 +270,138 @@ async def scrape_via_google_search(
     state: str = "CA",
     service: str = "hvac repair",
     headless: bool = True,
-    max_results: int = 50
+    max_results: int = 50,
+    pool: Optional[BrowserPool] = None,
+    debug: bool = DEBUG
 ) -> List[Dict]:
     """
     Scrape by going through Google search first.
+    
+    Pass a shared BrowserPool to reuse one Chromium across searches;
+    `headless` only applies when no pool is given. `debug` saves
+    screenshots and the raw page text to OUTPUT_DIR.
     """
     businesses = []
-    seen_phones = set()
     
     search_query = f"{service} near {city} {state}"
     url = f"https://www.google.com/search?q={search_query.replace(' ', '+')}"
     
     print(f"\n🔍 Scraping Google Local Services")
     print(f"   Search: {search_query}")
-    print(f"   Headless: {headless}\n")
+    print(f"   Headless: {pool.headless if pool else headless}\n")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=headless,
-            args=['--no-sandbox', '--disable-setuid-sandbox']
-        )
+    # Standalone calls get a throwaway pool; multi-city runs pass one in
+    own_pool = pool is None
+    if own_pool:
+        pool = BrowserPool(headless=headless)
+    
+    context = await pool.acquire_context()
+    page = None
+    
+    try:
+        page = await context.new_page()
+        print("📄 Loading Google search...")
+        await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+        # Move on as soon as the cards are in the DOM instead of a fixed sleep
+        try:
+            await page.wait_for_selector(_CARD_SELECTOR, state="attached", timeout=5000)
+        except PlaywrightTimeoutError:
+            await asyncio.sleep(0.5)
         
-        context = await browser.new_context(
-            viewport={"width": 1200, "height": 900},
-            user_agent="Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36",
-            locale="en-US"
+        # Take screenshot for debugging
+        if debug:
+            await page.screenshot(path=OUTPUT_DIR / "step1_search.png")
+        
+        # Look for "More businesses" or "Show more" to expand
+        try:
+            more_btn = await page.query_selector('text="More businesses"')
+            if more_btn:
+                await more_btn.click()
+                await page.wait_for_load_state("networkidle", timeout=3000)
+        except:
+            pass
+        
+        # The local service cards hold everything we need - scanning just
+        # them skips the rest of the (much larger) results page
+        print("📞 Extracting phone numbers from sponsored cards...")
+        # All card texts in one round-trip instead of one inner_text() per card
+        card_texts = await page.eval_on_selector_all(
+            _CARD_SELECTOR, "els => els.map(e => e.innerText || '')"
         )
+        print(f"   Found {len(card_texts)} local service cards")
         
-        page = await context.new_page()
+        businesses = parse_card_texts(card_texts, f"{city}, {state}", max_results)
         
-        try:
-            print("📄 Loading Google search...")
-            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
-            await asyncio.sleep(2)
-            
-            # Take screenshot for debugging
-            await page.screenshot(path=OUTPUT_DIR / "step1_search.png")
-            
-            # Look for "More businesses" or "Show more" to expand
-            try:
-                more_btn = await page.query_selector('text="More businesses"')
-                if more_btn:
-                    await more_btn.click()
-                    await asyncio.sleep(2)
-            except:
-                pass
-            
-            # Now get the page content
-            html = await page.content()
+        if not card_texts:
+            # No card markup (layout change?) - fall back to the full page text
+            print("   No cards found, scanning the whole page...")
             text = await page.inner_text("body")
             
             # Save raw text for debugging
-            with open(OUTPUT_DIR / "debug_text.txt", "w") as f:
-                f.write(text)
-            
-            print("📞 Extracting phone numbers...")
-            
-            # Find all phone number patterns in the text
-            phone_pattern = r'\((\d{3})\)\s*(\d{3})[-.\s]?(\d{4})'
-            
-            # Split text into chunks to associate phones with business names
-            lines = text.split('\n')
+            if debug:
+                with open(OUTPUT_DIR / "debug_text.txt", "w") as f:
+                    f.write(text)
             
-            current_business = None
-            
-            for i, line in enumerate(lines):
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Check if this line contains a phone number
-                phone_match = re.search(phone_pattern, line)
-                if phone_match:
-                    phone = clean_phone(phone_match.group(0))
-                    if phone and phone not in seen_phones:
-                        # Look backward for business name
-                        name = None
-                        rating = None
-                        reviews = None
-                        
-                        # Search backwards for the business name
-                        for j in range(i-1, max(0, i-15), -1):
-                            prev = lines[j].strip()
-                            if not prev:
-                                continue
-                            
-                            # Skip common non-name patterns
-                            skip_patterns = [
-                                'Get phone', 'Book', 'Message', 'Share', 'Sponsored',
-                                'Open', 'Closes', 'hours', 'HVAC Pro', 'years in business',
-                                'Serves', 'Free estimate', 'Reviews', 'Website', 'Directions'
-                            ]
-                            if any(p.lower() in prev.lower() for p in skip_patterns):
-                                continue
-                            
-                            # Check for rating pattern
-                            rating_match = re.match(r'^(\d\.\d)\s*[★☆·]', prev)
-                            if rating_match:
-                                rating = float(rating_match.group(1))
-                                rev_match = re.search(r'\(([\d,]+)\)', prev)
-                                if rev_match:
-                                    reviews = int(rev_match.group(1).replace(',', ''))
-                                continue
-                            
-                            # This might be the business name
-                            # Names typically start with capital letter, have multiple words
-                            if (re.match(r'^[A-Z]', prev) and 
-                                len(prev) > 3 and 
-                                not re.match(r'^[\d\.\s]+$', prev)):
-                                name = prev
-                                break
-                        
-                        if name:
-                            seen_phones.add(phone)
-                            
-                            # Check context for 24 hours
-                            context_start = max(0, i-10)
-                            context_text = '\n'.join(lines[context_start:i+3]).lower()
-                            is_24h = 'open 24' in context_text or '24 hour' in context_text
-                            
-                            businesses.append({
-                                'name': name,
-                                'phone': phone,
-                                'rating': rating,
-                                'reviews': reviews,
-                                'is_24_hours': is_24h,
-                                'source': f"{city}, {state}"
-                            })
-                            print(f"   ✅ {name}: {phone}")
-            
-            # Also try to extract from the local services cards specifically
-            print("\n📋 Checking sponsored section...")
-            
-            # Find local services cards
-            cards = await page.query_selector_all('[data-attrid="local_card"]')
-            if not cards:
-                cards = await page.query_selector_all('.rllt__details')
-            if not cards:
-                cards = await page.query_selector_all('[data-local-attribute]')
-            
-            print(f"   Found {len(cards)} local service cards")
-            
-            for card in cards[:max_results]:
-                try:
-                    card_text = await card.inner_text()
-                    
-                    # Look for phone in card
-                    phone_match = re.search(phone_pattern, card_text)
-                    if phone_match:
-                        phone = clean_phone(phone_match.group(0))
-                        if phone and phone not in seen_phones:
-                            # First non-empty line is usually the name
-                            lines = [l.strip() for l in card_text.split('\n') if l.strip()]
-                            name = lines[0] if lines else "Unknown"
-                            
-                            seen_phones.add(phone)
-                            businesses.append({
-                                'name': name,
-                                'phone': phone,
-                                'rating': None,
-                                'reviews': None,
-                                'is_24_hours': 'open 24' in card_text.lower(),
-                                'source': f"{city}, {state}"
-                            })
-                            print(f"   ✅ {name}: {phone}")
-                except:
-                    continue
-            
-            # Final screenshot
+            # Parse off the event loop so sibling pages keep loading
+            businesses = await asyncio.to_thread(parse_page_text, text, f"{city}, {state}")
+        
+        # Final screenshot
+        if debug:
             await page.screenshot(path=OUTPUT_DIR / "step2_final.png")
             print(f"\n   📸 Screenshots saved to {OUTPUT_DIR}/")
-            
-        except Exception as e:
-            print(f"❌ Error: {e}")
-            import traceback
-            traceback.print_exc()
+        
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+        traceback.print_exc()
+        if debug and page is not None:
             await page.screenshot(path=OUTPUT_DIR / "error_screenshot.png")
-        finally:
-            await browser.close()
+    finally:
+        if page is not None:
+            await page.close()
+        await pool.release(context)
+        if own_pool:
+            await pool.close()
     
     return businesses
 
 
+async def scrape_cities(
+    locations: List[tuple],
+    pool: BrowserPool,
+    service: str = "hvac repair",
+    max_results: int = 50,
+    debug: bool = DEBUG
+) -> List[Dict]:
+    """
+    Scrape several (city, state) locations concurrently on one browser.
+    
+    Results come back in location order, deduped by phone across cities.
+    A pool with a persistent profile has only one shared context, so its
+    cities run one at a time to keep their cookies and location apart.
+    """
+    semaphore = asyncio.Semaphore(1 if pool.profile_dir is not None else MAX_CONCURRENCY)
+    
+    async def _one(city, state):
+        async with semaphore:
+            return await scrape_via_google_search(
+                city=city, state=state, service=service,
+                max_results=max_results, pool=pool, debug=debug
+            )
+    
+    per_city = await asyncio.gather(*(_one(city, state) for city, state in locations))
+    
+    businesses = []
+    seen_phones = set()  # Int keys - smaller and faster to hash than the strings
+    for city_businesses in per_city:
+        for b in city_businesses:
+            key = phone_key(b['phone'])
+            if key not in seen_phones:
+                seen_phones.add(key)
+                businesses.append(b)
+    return businesses
+
+
 def save_results(businesses: List[Dict], prefix: str = "hvac_leads"):
     """Save results to files."""
     if not businesses:
@@ -235,14 +419,16 @@ def save_results(businesses: List[Dict], prefix: str = "hvac_leads"):
     
     # JSON
     json_file = OUTPUT_DIR / f"{prefix}_{timestamp}.json"
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(businesses, f, indent=2)
+    if orjson is not None:
+        json_file.write_bytes(orjson.dumps(businesses, option=orjson.OPT_INDENT_2))
+    else:
+        with open(json_file, 'w', encoding='utf-8') as f:
+            json.dump(businesses, f, indent=2)
     
     # Phone list
     phones_file = OUTPUT_DIR / f"{prefix}_{timestamp}_phones.txt"
     with open(phones_file, 'w') as f:
-        for b in businesses:
-            f.write(f"{b['phone']}\t{b['name']}\n")
+        f.write(''.join(f"{b['phone']}\t{b['name']}\n" for b in businesses))
     
     print(f"\n💾 Saved {len(businesses)} leads:")
     print(f"   {csv_file}")
@@ -256,18 +442,37 @@ async def main():
     parser.add_argument("--service", default="hvac repair", help="Service to search")
     parser.add_argument("--visible", action="store_true", help="Show browser")
     parser.add_argument("--max", type=int, default=50, help="Max results")
+    parser.add_argument("--debug", action="store_true", default=DEBUG,
+                        help="Save screenshots and raw page text (or set LSA_DEBUG=1)")
+    parser.add_argument("--cities", nargs="+", metavar="'CITY, ST'",
+                        help="Scrape several locations (overrides --city/--state)")
+    parser.add_argument("--no-chrome-profile", action="store_true",
+                        help="Fresh context per city instead of the persistent profile in "
+                             + str(PROFILE_DIR) + " (lets --cities run concurrently)")
     
     args = parser.parse_args()
     
-    businesses = await scrape_via_google_search(
-        city=args.city,
-        state=args.state,
-        service=args.service,
-        headless=not args.visible,
-        max_results=args.max
-    )
+    profile_dir = None if args.no_chrome_profile else PROFILE_DIR
+    async with BrowserPool(headless=not args.visible, profile_dir=profile_dir) as pool:
+        if args.cities:
+            locations = [tuple(part.strip() for part in loc.rsplit(",", 1)) for loc in args.cities]
+            if any(len(loc) != 2 for loc in locations):
+                parser.error("--cities entries look like 'Dallas, TX'")
+            businesses = await scrape_cities(
+                locations, pool, service=args.service, max_results=args.max, debug=args.debug
+            )
+        else:
+            businesses = await scrape_via_google_search(
+                city=args.city,
+                state=args.state,
+                service=args.service,
+                max_results=args.max,
+                pool=pool,
+                debug=args.debug
+            )
     
-    save_results(businesses, f"hvac_{args.city.lower().replace(' ', '_')}")
+    prefix = "hvac_lsa_multi_city" if args.cities else f"hvac_{args.city.lower().replace(' ', '_')}"
+    save_results(businesses, prefix)
     
     print(f"\n{'='*50}")
     print(f"📊 Total: {len(businesses)} businesses with phone numbers")
@@ -5,86 +5,116 @@ Scrapes businesses across major US metro areas using RapidAPI.
 Smart zip code spacing to maximize coverage without duplicates.
 """
 import os
+import asyncio
+import random
 import json
 import csv
-import time
-import requests
+import httpx
+import pandas as pd
 from datetime import datetime
 from pathlib import Path
 
+from common import normalize_phone as format_phone, phone_key, retry_after
+
+try:
+    import orjson
+except ImportError:
+    # Optional speedup - the stdlib json module is used without it
+    orjson = None
+
+try:
+    import pyarrow
+except ImportError:
+    # Optional - the Parquet copy of the leads is skipped without it
+    pyarrow = None
+
 OUTPUT_DIR = Path("data")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+LEAD_FIELDS = ["name", "phone", "address", "city", "state", "zip",
+               "rating", "reviews", "is_24_hours", "website", "google_id"]
+
+# Dedupe key for names: drop spaces, spell out "&"
+_NAME_KEY_TABLE = str.maketrans({" ": None, "&": "and"})
+
 RAPIDAPI_KEY = os.environ.get("RAPIDAPI_KEY", "769cd3d089msh9577ad89e236d72p198215jsnfeab8ea24465")
 RAPIDAPI_HOST = "local-business-data.p.rapidapi.com"
 
+# Zip code searches in flight at once
+MAX_CONCURRENCY = int(os.environ.get("MAX_CONCURRENCY", "8"))
+# Seconds to back off after each successive 429 (plus up to 1s jitter);
+# the search gives up once the table runs out
+RATE_LIMIT_BACKOFF = (1, 2, 4, 8, 16, 30)
+
 # Strategic metro areas with spaced-out zip codes for max coverage
 # Each city has 2-3 zip codes spread across different areas
-METRO_AREAS = [
+# (city, state, zips) - immutable, unpacked directly in the scrape loop
+METRO_AREAS = (
     # California
-    {"city": "Los Angeles", "state": "CA", "zips": ["90001", "90210", "91301"]},
-    {"city": "San Diego", "state": "CA", "zips": ["92101", "92129"]},
-    {"city": "San Francisco", "state": "CA", "zips": ["94102", "94536"]},
+    ("Los Angeles", "CA", ("90001", "90210", "91301")),
+    ("San Diego", "CA", ("92101", "92129")),
+    ("San Francisco", "CA", ("94102", "94536")),
     
     # Texas - huge HVAC market (hot climate)
-    {"city": "Houston", "state": "TX", "zips": ["77001", "77070", "77459"]},
-    {"city": "Dallas", "state": "TX", "zips": ["75201", "75287", "75080"]},
-    {"city": "Austin", "state": "TX", "zips": ["78701", "78759"]},
-    {"city": "San Antonio", "state": "TX", "zips": ["78201", "78258"]},
+    ("Houston", "TX", ("77001", "77070", "77459")),
+    ("Dallas", "TX", ("75201", "75287", "75080")),
+    ("Austin", "TX", ("78701", "78759")),
+    ("San Antonio", "TX", ("78201", "78258")),
     
     # Arizona - hot climate = high HVAC demand
-    {"city": "Phoenix", "state": "AZ", "zips": ["85001", "85254", "85048"]},
-    {"city": "Tucson", "state": "AZ", "zips": ["85701", "85750"]},
+    ("Phoenix", "AZ", ("85001", "85254", "85048")),
+    ("Tucson", "AZ", ("85701", "85750")),
     
     # Florida - hot/humid = year-round HVAC
-    {"city": "Miami", "state": "FL", "zips": ["33101", "33180", "33155"]},
-    {"city": "Orlando", "state": "FL", "zips": ["32801", "32819"]},
-    {"city": "Tampa", "state": "FL", "zips": ["33601", "33647"]},
-    {"city": "Jacksonville", "state": "FL", "zips": ["32202", "32256"]},
+    ("Miami", "FL", ("33101", "33180", "33155")),
+    ("Orlando", "FL", ("32801", "32819")),
+    ("Tampa", "FL", ("33601", "33647")),
+    ("Jacksonville", "FL", ("32202", "32256")),
     
     # Georgia
-    {"city": "Atlanta", "state": "GA", "zips": ["30301", "30327", "30093"]},
+    ("Atlanta", "GA", ("30301", "30327", "30093")),
     
     # Nevada
-    {"city": "Las Vegas", "state": "NV", "zips": ["89101", "89134", "89052"]},
+    ("Las Vegas", "NV", ("89101", "89134", "89052")),
     
     # Colorado
-    {"city": "Denver", "state": "CO", "zips": ["80202", "80237", "80123"]},
+    ("Denver", "CO", ("80202", "80237", "80123")),
     
     # North Carolina
-    {"city": "Charlotte", "state": "NC", "zips": ["28202", "28277"]},
-    {"city": "Raleigh", "state": "NC", "zips": ["27601", "27615"]},
+    ("Charlotte", "NC", ("28202", "28277")),
+    ("Raleigh", "NC", ("27601", "27615")),
     
     # Tennessee
-    {"city": "Nashville", "state": "TN", "zips": ["37201", "37215"]},
+    ("Nashville", "TN", ("37201", "37215")),
     
     # Illinois
-    {"city": "Chicago", "state": "IL", "zips": ["60601", "60614", "60618"]},
+    ("Chicago", "IL", ("60601", "60614", "60618")),
     
     # New York Metro
-    {"city": "New York", "state": "NY", "zips": ["10001", "10028", "11201"]},
+    ("New York", "NY", ("10001", "10028", "11201")),
     
     # Pennsylvania
-    {"city": "Philadelphia", "state": "PA", "zips": ["19102", "19128"]},
+    ("Philadelphia", "PA", ("19102", "19128")),
     
     # Washington
-    {"city": "Seattle", "state": "WA", "zips": ["98101", "98115"]},
+    ("Seattle", "WA", ("98101", "98115")),
     
     # Massachusetts
-    {"city": "Boston", "state": "MA", "zips": ["02101", "02134"]},
-]
+    ("Boston", "MA", ("02101", "02134")),
+)
+
 
+API_URL = "https://local-business-data.p.rapidapi.com"
+HEADERS = {
+    "x-rapidapi-key": RAPIDAPI_KEY,
+    "x-rapidapi-host": RAPIDAPI_HOST
+}
 
-def search_hvac_businesses(city: str, state: str, zip_code: str, limit: int = 20) -> list:
+
+async def search_hvac_businesses(client: httpx.AsyncClient, city: str, state: str,
+                                 zip_code: str, limit: int = 20) -> list:
     """Search for HVAC businesses in a location."""
     
-    url = "https://local-business-data.p.rapidapi.com/search"
-    
-    headers = {
-        "x-rapidapi-key": RAPIDAPI_KEY,
-        "x-rapidapi-host": RAPIDAPI_HOST
-    }
-    
     params = {
         "query": f"HVAC repair near {zip_code} {city} {state}",
         "limit": str(limit),
@@ -92,163 +122,193 @@ def search_hvac_businesses(city: str, state: str, zip_code: str, limit: int = 20
         "language": "en"
     }
     
-    try:
-        response = requests.get(url, headers=headers, params=params, timeout=15)
-        
-        if response.status_code == 200:
-            data = response.json()
-            return data.get("data", [])
-        elif response.status_code == 429:
-            print(f"      ⚠️ Rate limited, waiting 10s...")
-            time.sleep(10)
-            return search_hvac_businesses(city, state, zip_code, limit)
-        else:
-            print(f"      ❌ Error {response.status_code}")
-            return []
+    for backoff in RATE_LIMIT_BACKOFF + (None,):
+        try:
+            response = await client.get("/search", params=params)
             
-    except Exception as e:
-        print(f"      ❌ Exception: {e}")
-        return []
+            if response.status_code == 200:
+                data = response.json()
+                return data.get("data", [])
+            elif response.status_code == 429:
+                if backoff is None:
+                    print(f"      ❌ Still rate limited, giving up on {zip_code}")
+                    return []
+                wait = retry_after(response, default=backoff + random.random())
+                print(f"      ⚠️ Rate limited, waiting {wait:.1f}s...")
+                await asyncio.sleep(wait)  # Other searches keep running meanwhile
+            else:
+                print(f"      ❌ Error {response.status_code}")
+                return []
+                
+        except Exception as e:
+            print(f"      ❌ Exception: {e}")
+            return []
 
 
-def format_phone(phone: str) -> str:
-    """Format phone to +1XXXXXXXXXX."""
-    if not phone:
-        return None
-    digits = ''.join(c for c in phone if c.isdigit())
-    if len(digits) == 10:
-        return f"+1{digits}"
-    elif len(digits) == 11 and digits.startswith("1"):
-        return f"+{digits}"
-    return None
+async def fetch_zip(client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                    city: str, state: str, zip_code: str) -> list:
+    """Run one zip code search, bounded by the shared semaphore."""
+    async with semaphore:
+        return await search_hvac_businesses(client, city, state, zip_code)
 
 
-def main():
+async def main():
     print("\n" + "="*70)
     print("🌎 MULTI-CITY HVAC LEAD SCRAPER")
     print("   Targeting businesses currently advertising on Google")
     print("="*70)
     
-    all_leads = []
-    seen_phones = set()
+    # Column-per-field lead buffer (one list per CSV column, not a dict per lead)
+    leads = {field: [] for field in LEAD_FIELDS}
+    columns = tuple(leads.values())
+    seen_phones = set()  # phone_key() ints - smaller and faster to hash than the strings
     seen_names = set()
     
     total_metros = len(METRO_AREAS)
     
-    for i, metro in enumerate(METRO_AREAS, 1):
-        city = metro["city"]
-        state = metro["state"]
-        zips = metro["zips"]
-        
-        print(f"\n[{i}/{total_metros}] 📍 {city}, {state}")
-        
-        metro_leads = []
+    # Leads are written to the CSV as they're found, so a crash keeps them
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    csv_file = OUTPUT_DIR / f"hvac_multi_city_{timestamp}.csv"
+    with open(csv_file, 'w', newline='', encoding='utf-8', buffering=1 << 20) as csv_out:
+        writer = csv.writer(csv_out)
+        writer.writerow(LEAD_FIELDS)
         
-        for zip_code in zips:
-            print(f"   → Searching {zip_code}...", end=" ", flush=True)
+        # One pooled client for every search: TCP+TLS to RapidAPI is reused
+        async with httpx.AsyncClient(
+            base_url=API_URL,
+            headers=HEADERS,
+            timeout=15,
+            limits=httpx.Limits(max_connections=MAX_CONCURRENCY, keepalive_expiry=60),
+        ) as client:
+            # Start every search up front; results are consumed in metro order below
+            # so dedupe (first seen wins) stays deterministic
+            semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+            searches = [
+                [asyncio.create_task(fetch_zip(client, semaphore, city, state, zip_code))
+                 for zip_code in zips]
+                for city, state, zips in METRO_AREAS
+            ]
             
-            businesses = search_hvac_businesses(city, state, zip_code)
-            
-            new_count = 0
-            for biz in businesses:
-                phone = format_phone(biz.get("phone_number"))
-                name = biz.get("name", "")
+            for i, (city, state, zips) in enumerate(METRO_AREAS, 1):
+                print(f"\n[{i}/{total_metros}] 📍 {city}, {state}")
                 
-                # Dedupe by phone AND name (some businesses have multiple locations)
-                name_key = name.lower().replace(" ", "").replace("&", "and")[:20]
+                metro_count = 0
                 
-                if phone and phone not in seen_phones and name_key not in seen_names:
-                    seen_phones.add(phone)
-                    seen_names.add(name_key)
+                for zip_code, search in zip(zips, searches[i - 1]):
+                    print(f"   → Searching {zip_code}...", end=" ", flush=True)
                     
-                    # Check for 24 hours in working hours
-                    hours = biz.get("working_hours", {})
-                    is_24h = False
-                    if hours:
-                        for day, time_str in hours.items():
-                            if "24" in str(time_str).lower() or "open 24" in str(time_str).lower():
-                                is_24h = True
-                                break
+                    businesses = await search
                     
-                    lead = {
-                        "name": name,
-                        "phone": phone,
-                        "address": biz.get("full_address", ""),
-                        "city": city,
-                        "state": state,
-                        "zip": zip_code,
-                        "rating": biz.get("rating"),
-                        "reviews": biz.get("review_count"),
-                        "is_24_hours": is_24h,
-                        "website": biz.get("website", ""),
-                        "google_id": biz.get("business_id", "")
-                    }
-                    metro_leads.append(lead)
-                    all_leads.append(lead)
-                    new_count += 1
-            
-            print(f"+{new_count} leads")
-            time.sleep(0.5)  # Small delay between requests
-        
-        print(f"   ✅ {city}: {len(metro_leads)} unique leads")
+                    new_count = 0
+                    for biz in businesses:
+                        phone = format_phone(biz.get("phone_number"))
+                        if not phone:
+                            continue
+                        name = biz.get("name", "")
+                        
+                        # Dedupe by phone AND name (some businesses have multiple locations)
+                        key = phone_key(phone)
+                        name_key = name.lower().translate(_NAME_KEY_TABLE)[:20]
+                        
+                        if key not in seen_phones and name_key not in seen_names:
+                            seen_phones.add(key)
+                            seen_names.add(name_key)
+                            
+                            # Check for 24 hours in working hours
+                            # ("open 24" always contains "24", and digits have no case)
+                            hours = biz.get("working_hours", {})
+                            is_24h = bool(hours) and any("24" in str(times) for times in hours.values())
+                            
+                            # Same order as LEAD_FIELDS
+                            row = (
+                                name,
+                                phone,
+                                biz.get("full_address", ""),
+                                city,
+                                state,
+                                zip_code,
+                                biz.get("rating"),
+                                biz.get("review_count"),
+                                is_24h,
+                                biz.get("website", ""),
+                                biz.get("business_id", ""),
+                            )
+                            for column, value in zip(columns, row):
+                                column.append(value)
+                            writer.writerow(row)
+                            new_count += 1
+                    
+                    print(f"+{new_count} leads")
+                    metro_count += new_count
+                
+                print(f"   ✅ {city}: {metro_count} unique leads")
+                csv_out.flush()
     
     # Save results
-    if all_leads:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # CSV
-        csv_file = OUTPUT_DIR / f"hvac_multi_city_{timestamp}.csv"
-        with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.DictWriter(f, fieldnames=all_leads[0].keys())
-            writer.writeheader()
-            writer.writerows(all_leads)
+    if leads["phone"]:
+        # object dtype keeps None/int values as-is (no NaN or float upcasts)
+        df = pd.DataFrame(leads, dtype=object)
         
         # JSON
         json_file = OUTPUT_DIR / f"hvac_multi_city_{timestamp}.json"
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(all_leads, f, indent=2)
+        records = df.to_dict("records")
+        if orjson is not None:
+            json_file.write_bytes(orjson.dumps(records, option=orjson.OPT_INDENT_2))
+        else:
+            with open(json_file, 'w', encoding='utf-8') as f:
+                json.dump(records, f, indent=2)
         
         # Phone list for calling (24/7 businesses first)
         phones_file = OUTPUT_DIR / f"hvac_multi_city_{timestamp}_phones.txt"
         
-        # Sort: 24/7 businesses first
-        sorted_leads = sorted(all_leads, key=lambda x: (not x["is_24_hours"], x["city"]))
+        # Sort: 24/7 businesses first, then by city (stable, like sorted())
+        ordered = df.sort_values(["is_24_hours", "city"], ascending=[False, True], kind="stable")
+        is_24h = ordered["is_24_hours"].astype(bool)
+        lines = ordered["phone"] + "\t" + ordered["name"] + "\t" + ordered["city"] + ", " + ordered["state"] + "\n"
+        hot = "".join(lines[is_24h])
+        cold = "".join(lines[~is_24h])
         
+        # Whole file in one write
         with open(phones_file, 'w') as f:
-            f.write("# 24/7 BUSINESSES (Priority Targets)\n")
-            for lead in sorted_leads:
-                if lead["is_24_hours"]:
-                    f.write(f"{lead['phone']}\t{lead['name']}\t{lead['city']}, {lead['state']}\n")
-            
-            f.write("\n# OTHER BUSINESSES\n")
-            for lead in sorted_leads:
-                if not lead["is_24_hours"]:
-                    f.write(f"{lead['phone']}\t{lead['name']}\t{lead['city']}, {lead['state']}\n")
+            f.write(f"# 24/7 BUSINESSES (Priority Targets)\n{hot}\n# OTHER BUSINESSES\n{cold}")
+        
+        # Columnar copy for analytics (the CSV is still the source of truth),
+        # written last so a conversion error can't cost us the calling list
+        parquet_file = None
+        if pyarrow is not None:
+            parquet_file = OUTPUT_DIR / f"hvac_multi_city_{timestamp}.parquet"
+            try:
+                df.to_parquet(parquet_file, engine="pyarrow", compression="zstd", index=False)
+            except Exception as e:
+                print(f"   ⚠️ Skipped Parquet copy: {e}")
+                parquet_file.unlink(missing_ok=True)
+                parquet_file = None
         
         # Stats
         print(f"\n{'='*70}")
         print(f"✅ SCRAPING COMPLETE!")
         print(f"{'='*70}")
-        print(f"   📊 Total unique leads: {len(all_leads)}")
-        print(f"   🕐 Claiming 24/7: {len([l for l in all_leads if l['is_24_hours']])}")
+        print(f"   📊 Total unique leads: {len(df)}")
+        print(f"   🕐 Claiming 24/7: {int(df['is_24_hours'].astype(bool).sum())}")
         print(f"   🏙️  Cities covered: {len(METRO_AREAS)}")
         
         print(f"\n💾 Files saved:")
         print(f"   📄 {csv_file}")
         print(f"   📄 {json_file}")
+        if parquet_file is not None:
+            print(f"   📄 {parquet_file}")
         print(f"   📞 {phones_file}")
         
         # Top cities by lead count
-        from collections import Counter
-        city_counts = Counter(l["city"] for l in all_leads)
         print(f"\n📈 Top cities by lead count:")
-        for city, count in city_counts.most_common(5):
+        for city, count in df["city"].value_counts().head(5).items():
             print(f"   • {city}: {count}")
     
     else:
+        csv_file.unlink()  # Header only
         print("\n❌ No leads found")
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
 
@@ -10,21 +10,35 @@ Usage:
     python scrape_pi_lawyers.py --test --visible   # 3 zips, see browser
     python scrape_pi_lawyers.py                    # all 50 zips headless
     python scrape_pi_lawyers.py --service "HVAC"   # different category
+    python scrape_pi_lawyers.py --service "HVAC" "Plumbing"  # one browser, both
 """
-import asyncio, csv, re, random, argparse, sys
+import asyncio, csv, json, os, re, random, argparse, sys, statistics, time
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Optional
 
+from common import run_async
+
 try:
     from playwright.async_api import async_playwright
 except ImportError:
     print("pip install playwright && playwright install chromium")
     sys.exit(1)
 
+try:
+    import orjson
+except ImportError:
+    # Optional speedup for --format ndjson - stdlib json otherwise
+    orjson = None
+
 OUTPUT_DIR = Path("data")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+MAX_CONTEXTS = 4  # zips scraped at once, each in its own browser context
+CHROME_PROFILE_DIR = OUTPUT_DIR / "chrome_profile"  # persistent Chrome profile (cache, cookies)
+DEBUG_PNG = bool(os.environ.get("LSA_DEBUG_PNG"))  # also save PNGs with the HTML dumps
+ZIP_PAUSE = (3, 6)  # random seconds a page rests after one zip before changing area again
+
 TARGET_LOCATIONS = [
     ("77701","Beaumont, TX"),("78401","Corpus Christi, TX"),
     ("79401","Lubbock, TX"),("79101","Amarillo, TX"),
@@ -54,18 +68,29 @@ TARGET_LOCATIONS = [
 ]
 
 
+# Compiled once - parse_business runs on every button of every zip
+_RE_HAS_REV = re.compile(r"\(\d[\d,]*\)")
+_RE_MARKERS = re.compile("|".join(map(re.escape, (
+    "years in business","year in business","Serves ","Lawyer",
+    "Attorney","HVAC","Plumb","Electric","Open 24","Closed","Opens "))))
+_RE_NAME = re.compile(r"^(.+?)\s*\(([\d,]+)\)")  # name, then its review count
+_RE_REVIEWS = re.compile(r"\(([\d,]+)\)")
+_RE_YRS = re.compile(r"(\d+\+?)\s*years?\s*in\s*business")
+_RE_CLOSED = re.compile(r"(Closed[^\n]{0,40})")
+_RE_SERVES = re.compile(r"Serves\s+([A-Za-z\s.]+?)(?=\s+(?:Open|Closed|Closes))")
+
+
 def parse_business(text):
     """Parse business name/data from an LSA button's text."""
+    # Cheapest rejects first - most buttons are UI chrome, not listings
     if not text or len(text) < 15:
         return None
-    if not re.search(r"\(\d[\d,]*\)", text):
+    if not _RE_HAS_REV.search(text):
         return None
-    markers = ["years in business","year in business","Serves ","Lawyer",
-               "Attorney","HVAC","Plumb","Electric","Open 24","Closed","Opens "]
-    if not any(m in text for m in markers):
+    if not _RE_MARKERS.search(text):
         return None
 
-    nm = re.match(r"^(.+?)\s*\([\d,]+\)", text)
+    nm = _RE_NAME.match(text)
     if not nm:
         return None
     name = nm.group(1).strip()
@@ -73,21 +98,22 @@ def parse_business(text):
         return None
 
     r = {"name": name}
-    rev = re.search(r"\(([\d,]+)\)", text)
-    if rev:
-        r["reviews"] = int(rev.group(1).replace(",",""))
-    yrs = re.search(r"(\d+\+?)\s*years?\s*in\s*business", text)
+    # The count after the name is the first one, unless the text opens with one
+    rev = _RE_REVIEWS.match(text)
+    reviews = (rev.group(1) if rev else nm.group(2)).replace(",","")
+    if reviews:
+        r["reviews"] = int(reviews)
+    yrs = _RE_YRS.search(text)
     if yrs:
         r["years_in_business"] = yrs.group(1)
-    r["open_24h"] = "Open 24 hours" in text
-    if "Open 24 hours" in text:
+    open_24h = "Open 24 hours" in text
+    r["open_24h"] = open_24h
+    if open_24h:
         r["hours"] = "Open 24 hours"
-    elif "Closed" in text:
-        h = re.search(r"(Closed[^\n]{0,40})", text)
-        r["hours"] = h.group(1).strip() if h else "Closed"
     else:
-        r["hours"] = ""
-    srv = re.search(r"Serves\s+([A-Za-z\s.]+?)(?=\s+(?:Open|Closed|Closes))", text)
+        h = _RE_CLOSED.search(text)  # matches exactly when "Closed" is in text
+        r["hours"] = h.group(1).strip() if h else ""
+    srv = _RE_SERVES.search(text)
     if srv:
         r["serves"] = srv.group(1).strip()
     return r
@@ -96,44 +122,83 @@ def parse_business(text):
 FIELDS = ["name","reviews","years_in_business","open_24h",
           "hours","serves","zip_code","location","scraped_at"]
 
-def save_csv(biz_list, path):
-    if not biz_list:
-        return
-    with open(path, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
-        w.writeheader()
-        w.writerows(biz_list)
+OUTPUT_FORMATS = ("csv", "ndjson")
+
+
+class NdjsonWriter:
+    """writerows() for newline-delimited JSON, one object per listing."""
+
+    def __init__(self, f):
+        self.f = f
+
+    def writerows(self, rows):
+        if orjson is not None:
+            self.f.write(b"".join(orjson.dumps(r) + b"\n" for r in rows))
+        else:
+            self.f.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows).encode("utf-8"))
+
+
+def open_output(path, fmt="csv"):
+    """Open path for writing (CSV gets its header row); returns (file, writer)."""
+    if fmt == "ndjson":
+        f = open(path, "wb")
+        return f, NdjsonWriter(f)
+    f = open(path, "w", newline="", encoding="utf-8")
+    w = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+    w.writeheader()
+    return f, w
+
+
+# Same elements get_by_role("button") matches, read in one round-trip
+_BUTTON_SELECTOR = 'button, [role="button"]'
+
+
+async def button_texts(page):
+    """innerText of every button on the page, via a single evaluate call."""
+    try:
+        return await page.eval_on_selector_all(
+            _BUTTON_SELECTOR, "els => els.map(e => e.innerText || '')")
+    except Exception:
+        return []
 
 
 async def extract_businesses(page):
     biz = []
     seen = set()
-    for btn in await page.get_by_role("button").all():
-        try:
-            text = await btn.inner_text()
-            b = parse_business(text)
-            if b and b["name"] not in seen:
-                seen.add(b["name"])
-                biz.append(b)
-        except Exception:
-            pass
+    for text in await button_texts(page):
+        b = parse_business(text)
+        if b and b["name"] not in seen:
+            seen.add(b["name"])
+            biz.append(b)
     return biz
 
 
 async def wait_for_listings(page, timeout=8.0):
     end = asyncio.get_event_loop().time() + timeout
     while asyncio.get_event_loop().time() < end:
-        for btn in await page.get_by_role("button").all():
-            try:
-                t = await btn.inner_text()
-                if "years in business" in t:
-                    return True
-            except Exception:
-                pass
+        try:
+            found = await page.eval_on_selector_all(
+                _BUTTON_SELECTOR,
+                "els => els.some(e => (e.innerText || '').includes('years in business'))")
+            if found:
+                return True
+        except Exception:
+            pass
         await asyncio.sleep(0.5)
     return False
 
 
+async def dump_page(page, name):
+    """Save the page's HTML to data/<name>.html (plus a PNG with LSA_DEBUG_PNG=1)."""
+    try:
+        html = await page.content()
+        (OUTPUT_DIR / (name + ".html")).write_text(html, encoding="utf-8")
+        if DEBUG_PNG:
+            await page.screenshot(path=str(OUTPUT_DIR / (name + ".png")))
+    except Exception:
+        pass
+
+
 async def navigate_to_lsa(page, first_zip):
     """
     Get to the LSA prolist page like a real user:
@@ -196,7 +261,7 @@ async def navigate_to_lsa(page, first_zip):
             return True
 
         print("not found")
-        await page.screenshot(path=str(OUTPUT_DIR / "lsa_search_debug.png"))
+        await dump_page(page, "lsa_search_debug")
         return False
     except Exception as e:
         print("failed: " + str(e))
@@ -242,14 +307,144 @@ async def change_area(page, zip_code):
         return False
 
 
+BROWSER_ARGS = ["--no-sandbox","--disable-setuid-sandbox",
+                "--disable-gpu","--disable-dev-shm-usage","--memory-pressure-off"]
+CONTEXT_OPTIONS = dict(
+    viewport={"width": 1366, "height": 900},
+    locale="en-US",
+    timezone_id="America/New_York",
+)
+
+# Listings are read from button text, so these are never needed.
+# Stylesheets stay: innerText depends on layout (hidden elements drop out)
+BLOCKED_RESOURCES = frozenset({"image", "font", "media"})
+
+
+async def block_heavy_resources(route):
+    if route.request.resource_type in BLOCKED_RESOURCES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def open_lsa_page(page, service, first_zip):
+    """Take page to the LSA prolist page and select service; False on failure."""
+    if not await navigate_to_lsa(page, first_zip):
+        await dump_page(page, "lsa_nav_fail")
+        return False
+
+    print("  Selecting: " + service)
+    await select_service(page, service)
+    await wait_for_listings(page, timeout=8)
+    return True
+
+
+class LSAPagePool:
+    """
+    One Chrome browser and its LSA pages, kept warm between services.
+
+    Pages stay on the prolist page, so a later service only has to be
+    picked from the dropdown instead of navigated to from google.com.
+    Concurrent first callers share a single browser launch.
+
+    With profile_dir, Chrome runs on a persistent profile (one context,
+    a tab per page) so cookies and the HTTP cache carry over between
+    runs. Only one process can use a profile directory at a time.
+    """
+
+    def __init__(self, headless=True, profile_dir=None):
+        self.headless = headless
+        self.profile_dir = profile_dir
+        self._pages = {}  # page -> service currently selected on it
+        self._pw = None
+        self._launch_future = None
+
+    async def browser(self):
+        """The launched Browser, or the persistent BrowserContext."""
+        if self._launch_future is None:
+            self._launch_future = asyncio.ensure_future(self._launch())
+        return await self._launch_future
+
+    async def _launch(self):
+        self._pw = await async_playwright().start()
+        # Launch your REAL Chrome, not Playwright's Chromium
+        if self.profile_dir is not None:
+            Path(self.profile_dir).mkdir(parents=True, exist_ok=True)
+            ctx = await self._pw.chromium.launch_persistent_context(
+                str(self.profile_dir), headless=self.headless, channel="chrome",
+                args=BROWSER_ARGS, **CONTEXT_OPTIONS,
+            )
+            await ctx.route("**/*", block_heavy_resources)
+            return ctx
+        return await self._pw.chromium.launch(
+            headless=self.headless, channel="chrome", args=BROWSER_ARGS,
+        )
+
+    async def _new_page(self):
+        target = await self.browser()
+        if self.profile_dir is not None:
+            return await target.new_page()
+        ctx = await target.new_context(**CONTEXT_OPTIONS)
+        await ctx.route("**/*", block_heavy_resources)
+        return await ctx.new_page()
+
+    async def _open(self, service, first_zip):
+        page = await self._new_page()
+        if await open_lsa_page(page, service, first_zip):
+            return page
+        if self.profile_dir is not None:
+            await page.close()
+        else:
+            await page.context.close()
+        return None
+
+    async def acquire(self, service, first_zip, n):
+        """Up to n LSA pages with service selected (fewer if navigation fails)."""
+        warm = list(self._pages)[:n]
+        await asyncio.gather(*(self._switch(page, service)
+                               for page in warm if self._pages[page] != service))
+        opened = await asyncio.gather(
+            *(self._open(service, first_zip) for _ in range(n - len(warm))))
+        for page in opened:
+            if page is not None:
+                self._pages[page] = service
+        return list(self._pages)[:n]
+
+    async def _switch(self, page, service):
+        print("  Switching warm page to: " + service)
+        await select_service(page, service)
+        await wait_for_listings(page, timeout=8)
+        self._pages[page] = service
+
+    async def close(self):
+        if self._launch_future is None:
+            return
+        try:
+            browser = await self._launch_future
+            await browser.close()  # Browser or persistent context
+        finally:
+            if self._pw is not None:
+                await self._pw.stop()
+            self._pw = None
+            self._launch_future = None
+            self._pages.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
 async def run_scraper(service="Personal Injury Law", locations=None,
-                      headless=True, output_file=None):
+                      headless=True, output_file=None, contexts=MAX_CONTEXTS,
+                      pool=None, profile=False, fmt="csv"):
     if locations is None:
         locations = TARGET_LOCATIONS
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     if output_file is None:
         s = service.lower().replace(" ","_")
-        output_file = OUTPUT_DIR / ("lsa_" + s + "_" + ts + ".csv")
+        output_file = OUTPUT_DIR / ("lsa_" + s + "_" + ts + "." + fmt)
     else:
         output_file = Path(output_file)
 
@@ -262,132 +457,205 @@ async def run_scraper(service="Personal Injury Law", locations=None,
     print("  Service:   " + service)
     print("  Locations: " + str(len(locations)) + " zip codes")
     print("  Output:    " + str(output_file))
-    print("  Browser:   " + ("visible" if not headless else "headless"))
+    print("  Browser:   " + ("visible" if not headless else "headless")
+          + ("" if pool is None else " (warm pool)"))
+    print("  Contexts:  " + str(contexts))
     print("=" * 60)
     print()
 
-    async with async_playwright() as pw:
-        # Launch your REAL Chrome, not Playwright's Chromium
-        browser = await pw.chromium.launch(
-            headless=headless,
-            channel="chrome",
-            args=["--no-sandbox","--disable-setuid-sandbox"],
-        )
-        ctx = await browser.new_context(
-            viewport={"width": 1366, "height": 900},
-            locale="en-US",
-            timezone_id="America/New_York",
-        )
-        page = await ctx.new_page()
-
+    own_pool = pool is None
+    if own_pool:
+        pool = LSAPagePool(headless=headless)
+
+    pages = asyncio.Queue()
+    first_page = None
+    completed = False
+    out = writer = None  # opened on the first listings, so an empty run leaves no file
+    seen_names = set()  # lowercased firm names already written
+    ready_at = {}  # page -> loop time it may change area again (after its ZIP_PAUSE)
+    timings = {"wait": [], "nav": [], "extract": []}  # per-zip seconds (--profile)
+    done = []
+    zips_scraped = 0  # zips whose listings were read, even if every firm was a repeat
+    tot = str(len(locations))
+
+    def progress(zc, loc, result):
+        done.append(zc)
+        idx = str(len(done)).rjust(2)
+        print("  ["+idx+"/"+tot+"] "+loc.ljust(25)+" ("+zc+")  "+result)
+
+    async def scrape_one(zc, loc):
+        nonlocal out, writer, zips_scraped
+        # Any free LSA page will do - change_area moves it to this zip
+        page = await pages.get()
         try:
-            # Step 1 - navigate to LSA page
-            first_zip = locations[0][0]
-            print("[Step 1] Getting to LSA page...")
-            if not await navigate_to_lsa(page, first_zip):
-                print("Could not reach LSA. Screenshot saved to data/")
-                await page.screenshot(path=str(OUTPUT_DIR / "lsa_nav_fail.png"))
-                return []
-
-            # Step 2 - select service category
-            print()
-            print("[Step 2] Selecting: " + service)
-            await select_service(page, service)
-            await wait_for_listings(page, timeout=8)
-
-            # Step 3 - loop through zips
-            print()
-            print("[Step 3] Scraping " + str(len(locations)) + " zip codes")
-            print()
-
-            for i, (zc, loc) in enumerate(locations):
-                idx = str(i+1).rjust(2)
-                tot = str(len(locations))
-                print("  ["+idx+"/"+tot+"] "+loc.ljust(25)+" ("+zc+")", end="  ", flush=True)
-
-                if not await change_area(page, zc):
-                    print("SKIP")
-                    failed.append(zc)
-                    continue
-
-                await wait_for_listings(page, timeout=6)
-
-                # scroll to load all
-                for _ in range(2):
-                    try:
-                        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                        await asyncio.sleep(1.2)
-                    except Exception:
-                        pass
-
-                blist = await extract_businesses(page)
-                for b in blist:
-                    b["zip_code"] = zc
-                    b["location"] = loc
-                    b["scraped_at"] = datetime.now().isoformat()
-
-                all_biz.extend(blist)
-                print(str(len(blist)).rjust(2) + " firms")
-
-                save_csv(all_biz, output_file)
-
+            t0 = time.perf_counter()
+            rest = ready_at[page] - asyncio.get_running_loop().time()
+            if rest > 0:
+                await asyncio.sleep(rest)
+            t1 = time.perf_counter()
+            if not await change_area(page, zc):
+                progress(zc, loc, "SKIP")
+                failed.append(zc)
+                return
+
+            await wait_for_listings(page, timeout=6)
+
+            # scroll to load all
+            for _ in range(2):
                 try:
-                    await page.evaluate("window.scrollTo(0, 0)")
+                    await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+                    await asyncio.sleep(1.2)
                 except Exception:
                     pass
 
-                if i < len(locations) - 1:
-                    await asyncio.sleep(random.uniform(3.0, 6.0))
+            t2 = time.perf_counter()
+            blist = await extract_businesses(page)
+            t3 = time.perf_counter()
+            timings["wait"].append(t1 - t0)
+            timings["nav"].append(t2 - t1)
+            timings["extract"].append(t3 - t2)
+            zips_scraped += 1
+
+            # A firm advertising in several zips is kept once, at the first
+            # zip that finished (no await until the rows are written)
+            blist = [b for b in blist if b["name"].lower() not in seen_names]
+            seen_names.update(b["name"].lower() for b in blist)
+            scraped_at = datetime.now().isoformat()  # one timestamp per zip
+            for b in blist:
+                b["zip_code"] = zc
+                b["location"] = loc
+                b["scraped_at"] = scraped_at
+
+            # Only the new rows are written - the file is never rewritten
+            all_biz.extend(blist)
+            if blist:
+                if out is None:
+                    out, writer = open_output(output_file, fmt)
+                writer.writerows(blist)
+                out.flush()
+            progress(zc, loc, str(len(blist)).rjust(2) + " firms")
 
-        except KeyboardInterrupt:
-            print("\n\nInterrupted! Saving " + str(len(all_biz)) + " results...")
-        except Exception as e:
-            print("\nError: " + str(e))
-            import traceback; traceback.print_exc()
-        finally:
-            if all_biz:
-                save_csv(all_biz, output_file)
             try:
-                await page.screenshot(path=str(OUTPUT_DIR / "lsa_final.png"))
+                await page.evaluate("window.scrollTo(0, 0)")
             except Exception:
                 pass
-            await browser.close()
+        finally:
+            # The pause runs from the end of this zip, however long it took
+            ready_at[page] = asyncio.get_running_loop().time() + random.uniform(*ZIP_PAUSE)
+            pages.put_nowait(page)
+
+    try:
+        # Step 1 - get each context to the LSA page, service selected
+        first_zip = locations[0][0]
+        n = max(1, min(contexts, len(locations)))
+        print("[Step 1] Getting to LSA page on " + str(n) + " page(s)...")
+        for page in await pool.acquire(service, first_zip, n):
+            first_page = first_page or page
+            ready_at[page] = 0.0
+            pages.put_nowait(page)
+        if first_page is None:
+            print("Could not reach LSA. Page dump saved to data/")
+            return []
+
+        # Step 2 - spread the zips across the open pages
+        print()
+        print("[Step 2] Scraping " + str(len(locations)) + " zip codes on "
+              + str(pages.qsize()) + " page(s)")
+        print()
+
+        await asyncio.gather(
+            *(scrape_one(zc, loc) for zc, loc in locations))
+        completed = True
+
+    except KeyboardInterrupt:
+        print("\n\nInterrupted! Saving " + str(len(all_biz)) + " results...")
+    except Exception as e:
+        print("\nError: " + str(e))
+        import traceback; traceback.print_exc()
+    finally:
+        if out is not None:
+            out.close()
+        # Only worth a look when something went wrong
+        if first_page is not None and (failed or not completed):
+            await dump_page(first_page, "lsa_final")
+        if own_pool:
+            await pool.close()
 
     print()
     print("=" * 60)
     print("  SCRAPE COMPLETE")
-    print("  Total listings: " + str(len(all_biz)))
+    print("  Unique firms:   " + str(len(all_biz)))  # repeats are dropped as they're scraped
     if all_biz:
-        u = len(set(b["name"] for b in all_biz))
         h = len([b for b in all_biz if b.get("open_24h")])
-        z = len(set(b["zip_code"] for b in all_biz))
-        print("  Unique firms:   " + str(u))
         print("  Open 24 hours:  " + str(h))
-        print("  Zips scraped:   " + str(z) + "/" + str(len(locations)))
+    print("  Zips scraped:   " + str(zips_scraped) + "/" + str(len(locations)))
     if failed:
         print("  Failed zips:    " + ", ".join(failed))
     print("  Output:         " + str(output_file))
     print("=" * 60)
     print()
+    if profile:
+        print_timings(timings)
     return all_biz
 
 
+def print_timings(timings):
+    """Per-zip time split: waiting on the pace limiter, navigating, extracting."""
+    print("  Per-zip seconds     n    mean     p50     p90     max")
+    for phase, secs in timings.items():
+        if not secs:
+            continue
+        p90 = statistics.quantiles(secs, n=10)[-1] if len(secs) > 1 else secs[0]
+        print("  " + phase.ljust(14) + str(len(secs)).rjust(6)
+              + "".join(("%.2f" % v).rjust(8) for v in
+                        (statistics.mean(secs), statistics.median(secs), p90, max(secs))))
+    print()
+
+
+async def run_services(services, locations, headless=True, output_file=None,
+                       contexts=MAX_CONTEXTS, profile=False,
+                       profile_dir=CHROME_PROFILE_DIR, fmt="csv"):
+    """Scrape each service in turn, reusing one warm browser and its pages."""
+    async with LSAPagePool(headless=headless, profile_dir=profile_dir) as pool:
+        for service in services:
+            await run_scraper(
+                service=service, locations=locations, headless=headless,
+                output_file=output_file, contexts=contexts, pool=pool,
+                profile=profile, fmt=fmt,
+            )
+
+
 def main():
     p = argparse.ArgumentParser(description="Scrape Google LSA sponsored listings")
-    p.add_argument("--service", default="Personal Injury Law")
+    p.add_argument("--service", nargs="+", default=["Personal Injury Law"],
+                   help="One or more categories, scraped in turn on the same browser")
     p.add_argument("--test", action="store_true", help="First 3 zips only")
     p.add_argument("--visible", action="store_true", help="Show browser")
     p.add_argument("--output", default=None)
+    p.add_argument("--format", choices=OUTPUT_FORMATS, default="csv",
+                   help="Output file format (default %(default)s)")
+    p.add_argument("--contexts", type=int, default=MAX_CONTEXTS,
+                   help="Zips scraped at once (default %(default)s)")
+    p.add_argument("--no-chrome-profile", action="store_true",
+                   help="Fresh context per page instead of the persistent profile in "
+                        + str(CHROME_PROFILE_DIR))
+    p.add_argument("--profile", action="store_true",
+                   help="Print where per-zip time goes (pacing/navigation/extraction)")
     a = p.parse_args()
+    if a.output and len(a.service) > 1:
+        p.error("--output needs a single --service")
 
     locs = TARGET_LOCATIONS
     if a.test:
         locs = TARGET_LOCATIONS[:3]
         print("TEST MODE: 3 zip codes only\n")
 
-    asyncio.run(run_scraper(
-        service=a.service, locations=locs,
-        headless=not a.visible, output_file=a.output,
+    run_async(run_services(
+        a.service, locs,
+        headless=not a.visible, output_file=a.output, contexts=a.contexts,
+        profile=a.profile,
+        profile_dir=None if a.no_chrome_profile else CHROME_PROFILE_DIR,
+        fmt=a.format,
     ))
 
 if __name__ == "__main__":
@@ -8,19 +8,27 @@ from datetime import datetime
 import re
 import sys
 
+# Compiled once - parse_business runs for every listing passed in
+_RE_NAME = re.compile(r'^(.+?)\s*\([\d,]+\)')
+_RE_REVIEWS = re.compile(r'\(([\d,]+)\)')
+_RE_YRS = re.compile(r'(\d+\+?)\s*years?\s*in\s*business')
+_RE_CLOSED = re.compile(r'(Closed[^\n]{0,50})')
+_RE_CLOSES_SOON = re.compile(r'(Closes soon[^\n]{0,50})')
+_RE_SERVES = re.compile(r'Serves\s+([A-Za-z\s.]+?)(?=\s+(?:Open|Closed|Closes))')
+
 def parse_business(text, zip_code, location):
     if not text or len(text) < 15:
         return None
     
-    name_match = re.match(r'^(.+?)\s*\([\d,]+\)', text)
+    name_match = _RE_NAME.match(text)
     if not name_match:
         return None
     name = name_match.group(1).strip()
     
-    reviews_match = re.search(r'\(([\d,]+)\)', text)
+    reviews_match = _RE_REVIEWS.search(text)
     reviews = int(reviews_match.group(1).replace(',', '')) if reviews_match else 0
     
-    years_match = re.search(r'(\d+\+?)\s*years?\s*in\s*business', text)
+    years_match = _RE_YRS.search(text)
     years = years_match.group(1) if years_match else ''
     
     open_24h = 'Open 24 hours' in text
@@ -28,15 +36,15 @@ def parse_business(text, zip_code, location):
     if 'Open 24 hours' in text:
         hours = 'Open 24 hours'
     elif 'Closed' in text:
-        hours_match = re.search(r'(Closed[^\n]{0,50})', text)
+        hours_match = _RE_CLOSED.search(text)
         hours = hours_match.group(1).strip() if hours_match else 'Closed'
     elif 'Closes soon' in text:
-        hours_match = re.search(r'(Closes soon[^\n]{0,50})', text)
+        hours_match = _RE_CLOSES_SOON.search(text)
         hours = hours_match.group(1).strip() if hours_match else 'Closes soon'
     else:
         hours = ''
     
-    serves_match = re.search(r'Serves\s+([A-Za-z\s.]+?)(?=\s+(?:Open|Closed|Closes))', text)
+    serves_match = _RE_SERVES.search(text)
     serves = serves_match.group(1).strip() if serves_match else ''
     
     return {
@@ -13,16 +13,22 @@ Usage:
     python test_caller.py --limit 10                # Call 10 leads
     python test_caller.py --limit 10 --24-only      # Only 24/7 businesses
     python test_caller.py --phone +13105551234      # Call specific number
+    python test_caller.py --limit 30 --concurrency 5  # 5 calls in flight
 """
 import os
 import csv
 import json
-import time
+import re
+import asyncio
 import argparse
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import parse_qs
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioRestException
+from twilio.request_validator import RequestValidator
+
+from common import CallEvents, RateLimiter, run_async
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # TWILIO CONFIGURATION - Edit these or set as environment variables
@@ -32,6 +38,11 @@ TWILIO_ACCOUNT_SID = os.environ.get("TWILIO_ACCOUNT_SID", "YOUR_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.environ.get("TWILIO_AUTH_TOKEN", "YOUR_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER = os.environ.get("TWILIO_PHONE_NUMBER", "+1XXXXXXXXXX")  # Your Twilio number
 
+# Optional: public URL (e.g. an ngrok tunnel) that forwards to WEBHOOK_PORT.
+# When set, Twilio pushes call completion to us instead of us polling.
+TWILIO_STATUS_CALLBACK_URL = os.environ.get("TWILIO_STATUS_CALLBACK_URL", "")
+WEBHOOK_PORT = int(os.environ.get("WEBHOOK_PORT", "8766"))
+
 # ═══════════════════════════════════════════════════════════════════════════════
 
 OUTPUT_DIR = Path("data")
@@ -40,6 +51,49 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 # Results file
 RESULTS_FILE = OUTPUT_DIR / f"call_results_{datetime.now().strftime('%Y%m%d')}.csv"
 
+MAX_CONCURRENT_CALLS = 3  # Calls in flight at once
+MIN_CALL_SPACING = 1.0  # Seconds between call starts (Twilio's default 1 call/sec)
+FINAL_STATUSES = ("completed", "failed", "busy", "no-answer", "canceled")
+CALL_TIMEOUT = 60  # Seconds to wait for a call to finish
+_IS_24H = re.compile(r"24/7|24 hour", re.IGNORECASE).search
+
+
+def call_result(status: str, answered_by, duration, sid: str) -> dict:
+    return {
+        'status': status,
+        'answered_by': answered_by or 'unknown',
+        'duration': int(duration) if duration else 0,
+        'sid': sid
+    }
+
+
+def create_status_app(events: CallEvents, auth_token: str, callback_url: str):
+    """
+    Build the FastAPI app that receives Twilio status callbacks.
+    
+    Requests without a valid X-Twilio-Signature (signed with the auth token
+    over the public callback URL Twilio posted to) are rejected.
+    """
+    from fastapi import FastAPI, HTTPException, Request
+    
+    app = FastAPI()
+    validator = RequestValidator(auth_token)
+    
+    @app.post("/")
+    async def twilio_status(request: Request):
+        # Twilio posts form-encoded fields - and signs the empty ones too (CallerZip= etc.)
+        body = (await request.body()).decode()
+        form = {k: v[0] for k, v in parse_qs(body, keep_blank_values=True).items()}
+        if not validator.validate(callback_url, form, request.headers.get("x-twilio-signature", "")):
+            raise HTTPException(status_code=403, detail="bad signature")
+        sid = form.get("CallSid")
+        if sid and form.get("CallStatus") in FINAL_STATUSES:
+            events.resolve(sid, call_result(
+                form["CallStatus"], form.get("AnsweredBy"), form.get("CallDuration"), sid))
+        return {"status": "received"}
+    
+    return app
+
 
 def load_leads(phone_file: str = None) -> list:
     """Load leads from the most recent phone list file."""
@@ -56,28 +110,30 @@ def load_leads(phone_file: str = None) -> list:
     print(f"📂 Loading leads from: {file_path}")
     
     leads = []
-    with open(file_path, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('#'):
+    with open(file_path, 'r', newline='') as f:
+        # Tab-separated, no quoting (names may contain quotes)
+        for row in csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE):
+            if len(row) < 2 or not row[0].strip() or row[0].lstrip().startswith('#'):
                 continue
             
-            parts = line.split('\t')
-            if len(parts) >= 2:
-                leads.append({
-                    'phone': parts[0],
-                    'name': parts[1],
-                    'location': parts[2] if len(parts) > 2 else '',
-                    'is_24h': '24/7' in line or '24 hour' in line.lower()
-                })
+            leads.append({
+                'phone': row[0].strip(),
+                'name': row[1].strip(),
+                'location': row[2].strip() if len(row) > 2 else '',
+                'is_24h': any(_IS_24H(field) for field in row)
+            })
     
     return leads
 
 
-def make_call(client: Client, to_number: str, from_number: str) -> dict:
+async def make_call(client: Client, to_number: str, from_number: str,
+                    limiter: RateLimiter = None, events: CallEvents = None) -> dict:
     """
     Make a call and detect if human or voicemail answers.
     
+    With `events` (webhook mode) Twilio's status callback delivers the
+    result; otherwise the call is polled until it ends.
+    
     Returns dict with:
         - status: completed, no-answer, busy, failed
         - answered_by: human, machine, unknown
@@ -93,33 +149,52 @@ def make_call(client: Client, to_number: str, from_number: str) -> dict:
             <Hangup/>
         </Response>'''
         
-        call = client.calls.create(
+        callback = {}
+        if events is not None:
+            callback = {
+                'status_callback': TWILIO_STATUS_CALLBACK_URL,
+                'status_callback_event': ["completed"],
+                'status_callback_method': "POST",
+            }
+        
+        if limiter is not None:
+            await limiter.wait()
+        
+        # Twilio's client is blocking - run it off the event loop
+        call = await asyncio.to_thread(
+            client.calls.create,
             to=to_number,
             from_=from_number,
             twiml=twiml,
             timeout=30,  # Ring for 30 seconds max
             machine_detection="DetectMessageEnd",  # Detect voicemail
             machine_detection_timeout=10,
+            **callback,
         )
         
         print(f"   📞 Call initiated: {call.sid}")
         
+        if events is not None:
+            try:
+                return await events.wait(call.sid, CALL_TIMEOUT)
+            except asyncio.TimeoutError:
+                # Callback never arrived - check the call once directly
+                call = await asyncio.to_thread(client.calls(call.sid).fetch)
+                if call.status in FINAL_STATUSES:
+                    return call_result(call.status, call.answered_by, call.duration, call.sid)
+                return {'status': 'timeout', 'answered_by': 'unknown', 'duration': 0, 'sid': call.sid}
+        
         # Poll for completion
-        max_wait = 60
-        start = time.time()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
         
-        while time.time() - start < max_wait:
-            call = client.calls(call.sid).fetch()
+        while loop.time() - start < CALL_TIMEOUT:
+            call = await asyncio.to_thread(client.calls(call.sid).fetch)
             
-            if call.status in ["completed", "failed", "busy", "no-answer", "canceled"]:
-                return {
-                    'status': call.status,
-                    'answered_by': call.answered_by or 'unknown',
-                    'duration': int(call.duration) if call.duration else 0,
-                    'sid': call.sid
-                }
+            if call.status in FINAL_STATUSES:
+                return call_result(call.status, call.answered_by, call.duration, call.sid)
             
-            time.sleep(2)
+            await asyncio.sleep(2)
         
         return {'status': 'timeout', 'answered_by': 'unknown', 'duration': 0, 'sid': call.sid}
         
@@ -128,29 +203,38 @@ def make_call(client: Client, to_number: str, from_number: str) -> dict:
         return {'status': 'error', 'answered_by': 'none', 'duration': 0, 'error': str(e.msg)}
 
 
-def save_result(result: dict):
-    """Append result to CSV file."""
+RESULT_FIELDS = [
+    'timestamp', 'phone', 'name', 'location', 'is_24h',
+    'status', 'answered_by', 'duration', 'qualified'
+]
+
+
+def open_results():
+    """Open RESULTS_FILE for appending (header on a new file); returns (file, writer)."""
     file_exists = RESULTS_FILE.exists()
     
-    with open(RESULTS_FILE, 'a', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=[
-            'timestamp', 'phone', 'name', 'location', 'is_24h',
-            'status', 'answered_by', 'duration', 'qualified'
-        ])
-        
-        if not file_exists:
-            writer.writeheader()
-        
-        writer.writerow(result)
+    f = open(RESULTS_FILE, 'a', newline='')
+    writer = csv.DictWriter(f, fieldnames=RESULT_FIELDS)
+    
+    if not file_exists:
+        writer.writeheader()
+    
+    return f, writer
 
 
-def run_calls(
+async def run_calls(
     leads: list,
     limit: int = 10,
     only_24h: bool = False,
-    delay: int = 5
+    delay: int = 5,
+    concurrency: int = MAX_CONCURRENT_CALLS
 ):
-    """Run calls on a list of leads."""
+    """
+    Run calls on a list of leads.
+    
+    Up to concurrency calls are in flight at once; call starts are spaced
+    at least delay seconds apart.
+    """
     
     # Validate Twilio credentials
     if TWILIO_ACCOUNT_SID == "YOUR_ACCOUNT_SID":
@@ -180,19 +264,37 @@ def run_calls(
     print(f"   Time: {datetime.now().strftime('%I:%M %p %A')}")
     print(f"   Leads to call: {len(leads)}")
     print(f"   From number: {TWILIO_PHONE_NUMBER}")
+    print(f"   Concurrent calls: {concurrency}")
     print(f"{'='*60}\n")
     
     stats = {'total': 0, 'answered': 0, 'voicemail': 0, 'no_answer': 0, 'failed': 0}
+    # Opened once for the whole batch; flushed after each row so a crash keeps them
+    results_file, results_writer = open_results()
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(max(delay, MIN_CALL_SPACING))
+    
+    # Webhook mode: receive status callbacks instead of polling
+    events = None
+    server = None
+    if TWILIO_STATUS_CALLBACK_URL:
+        import uvicorn
+        events = CallEvents()
+        server = uvicorn.Server(uvicorn.Config(
+            create_status_app(events, TWILIO_AUTH_TOKEN, TWILIO_STATUS_CALLBACK_URL), host="0.0.0.0", port=WEBHOOK_PORT, log_level="warning",
+        ))
+        server_task = asyncio.create_task(server.serve())
+        print(f"   🔔 Listening for Twilio status callbacks on :{WEBHOOK_PORT} ({TWILIO_STATUS_CALLBACK_URL})")
     
-    for i, lead in enumerate(leads, 1):
+    async def call_lead(i, lead):
+        async with semaphore:
+            # Make the call
+            result = await make_call(client, lead['phone'], TWILIO_PHONE_NUMBER, limiter, events)
+        
         print(f"\n[{i}/{len(leads)}] {lead['name']}")
         print(f"   Phone: {lead['phone']}")
         print(f"   Location: {lead.get('location', 'N/A')}")
         print(f"   24/7: {'Yes' if lead.get('is_24h') else 'No'}")
         
-        # Make the call
-        result = make_call(client, lead['phone'], TWILIO_PHONE_NUMBER)
-        
         # Determine if qualified (didn't answer)
         qualified = result['status'] in ['no-answer'] or result['answered_by'] in ['machine_start', 'machine_end_beep', 'machine_end_silence', 'machine_end_other']
         
@@ -216,7 +318,7 @@ def run_calls(
         stats['total'] += 1
         
         # Save result
-        save_result({
+        results_writer.writerow({
             'timestamp': datetime.now().isoformat(),
             'phone': lead['phone'],
             'name': lead['name'],
@@ -227,11 +329,15 @@ def run_calls(
             'duration': result['duration'],
             'qualified': qualified
         })
+        results_file.flush()
         
-        # Delay between calls
-        if i < len(leads):
-            print(f"   ⏳ Waiting {delay}s before next call...")
-            time.sleep(delay)
+    try:
+        await asyncio.gather(*(call_lead(i, lead) for i, lead in enumerate(leads, 1)))
+    finally:
+        results_file.close()
+        if server is not None:
+            server.should_exit = True
+            await server_task
     
     # Summary
     qualified_count = stats['voicemail'] + stats['no_answer']
@@ -266,7 +372,7 @@ def test_single_call(phone: str):
     print(f"\n📞 Test calling: {phone}")
     print(f"   From: {TWILIO_PHONE_NUMBER}")
     
-    result = make_call(client, phone, TWILIO_PHONE_NUMBER)
+    result = run_async(make_call(client, phone, TWILIO_PHONE_NUMBER))
     
     print(f"\n📊 Result:")
     print(f"   Status: {result['status']}")
@@ -280,7 +386,9 @@ def main():
     parser.add_argument("--phone", type=str, help="Call a specific phone number")
     parser.add_argument("--limit", type=int, default=10, help="Max calls to make")
     parser.add_argument("--24-only", action="store_true", dest="only_24h", help="Only call 24/7 businesses")
-    parser.add_argument("--delay", type=int, default=5, help="Seconds between calls")
+    parser.add_argument("--delay", type=int, default=5, help="Seconds between call starts")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_CALLS,
+                        help="Calls in flight at once")
     parser.add_argument("--file", type=str, help="Phone list file to use")
     
     args = parser.parse_args()
@@ -295,7 +403,8 @@ def main():
         print(f"📋 Loaded {len(leads)} leads")
         
         limit = 1 if args.test else args.limit
-        run_calls(leads, limit=limit, only_24h=args.only_24h, delay=args.delay)
+        run_async(run_calls(leads, limit=limit, only_24h=args.only_24h,
+                            delay=args.delay, concurrency=args.concurrency))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,41 @@
+"""
+Signature checks on the Twilio status callback webhook.
+"""
+from urllib.parse import urlencode
+
+from fastapi.testclient import TestClient
+from twilio.request_validator import RequestValidator
+
+from common import CallEvents
+from test_caller import create_status_app
+
+AUTH_TOKEN = "test-token"
+CALLBACK_URL = "https://example.ngrok.io/"
+
+# Twilio sends (and signs) blank fields like these on real status callbacks
+FORM = {
+    "CallSid": "CA123",
+    "CallStatus": "ringing",
+    "CallerZip": "",
+    "FromZip": "",
+    "ForwardedFrom": "",
+}
+
+
+def post(client, form, signature):
+    return client.post(
+        "/",
+        content=urlencode(form),
+        headers={"Content-Type": "application/x-www-form-urlencoded", "X-Twilio-Signature": signature},
+    )
+
+
+def test_signed_callback_with_blank_fields_is_accepted():
+    client = TestClient(create_status_app(CallEvents(), AUTH_TOKEN, CALLBACK_URL))
+    signature = RequestValidator(AUTH_TOKEN).compute_signature(CALLBACK_URL, FORM)
+    assert post(client, FORM, signature).status_code == 200
+
+
+def test_bad_signature_is_rejected():
+    client = TestClient(create_status_app(CallEvents(), AUTH_TOKEN, CALLBACK_URL))
+    assert post(client, FORM, "bogus").status_code == 403
@@ -11,16 +11,33 @@ Usage:
     python vapi_caller.py --test                  # Test with 1 call
     python vapi_caller.py --limit 10              # Call 10 leads
     python vapi_caller.py --limit 50 --24-only    # Call 50 24/7 businesses
+    python vapi_caller.py --limit 50 --concurrency 20  # 20 calls in flight
 """
 import os
 import csv
 import json
+import re
 import time
+import hashlib
+import sqlite3
+import asyncio
 import argparse
 import requests
-from datetime import datetime, timezone, timedelta
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import date, datetime, timezone, timedelta
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterable, Iterator, List
+
+from common import CallEvents, RateLimiter, create_vapi_webhook_app, retry_after
+
+try:
+    import orjson
+except ImportError:
+    # Optional speedup - the stdlib json module is used without it
+    orjson = None
 
 # PST timezone (UTC-8)
 PST = timezone(timedelta(hours=-8))
@@ -39,9 +56,52 @@ VAPI_BASE_URL = "https://api.vapi.ai"
 # Get it from: Vapi Dashboard > Phone Numbers > click your number > copy the ID
 VAPI_PHONE_ID = os.environ.get("VAPI_PHONE_ID", "")
 
+# Optional: an existing assistant to use as-is (--new-ai still creates a fresh one)
+VAPI_ASSISTANT_ID = os.environ.get("VAPI_ASSISTANT_ID", "")
+
+# Grok (x.ai) classifies the transcripts
+XAI_API_KEY = os.environ.get("XAI_API_KEY", "")
+
+# Optional: public URL (e.g. an ngrok tunnel) that forwards to WEBHOOK_PORT.
+# When set, Vapi pushes end-of-call reports to us instead of us polling.
+VAPI_SERVER_URL = os.environ.get("VAPI_SERVER_URL", "")
+# Optional: shared secret Vapi sends back in x-vapi-secret so the webhook can
+# ignore requests that didn't come from Vapi
+VAPI_SERVER_SECRET = os.environ.get("VAPI_SERVER_SECRET", "")
+WEBHOOK_PORT = int(os.environ.get("WEBHOOK_PORT", "8765"))
+
+CALL_TIMEOUT = 150  # seconds to wait for a call to finish
+POLL_INITIAL_DELAY = 2.0  # first status poll, then grows 1.5x per poll
+POLL_MAX_DELAY = 10.0  # cap on the gap between status polls
+POLL_TICK = 3.0  # seconds between shared polls of all in-flight calls
+DELETE_WORKERS = 8  # parallel deletes when replacing old assistants (--new-ai)
+MAX_CONCURRENT_CALLS = 10  # Calls in flight at once (Vapi does the telephony)
+_IS_24H = re.compile(r"24/7|24 hour", re.IGNORECASE).search
+
 OUTPUT_DIR = Path("data")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Resolved assistant ID, reused across runs while ASSISTANT_CONFIG is unchanged
+ASSISTANT_CACHE = OUTPUT_DIR / ".assistant_cache.json"
+ASSISTANT_CACHE_TTL = 7 * 86400  # seconds
+
+# Numbers already called, so a rerun doesn't pay to call them again
+CALLED_DB = OUTPUT_DIR / ".called.sqlite"
+RECALL_AFTER = 7 * 86400  # seconds before a number is called again
+
+# Grok verdicts by normalized transcript, kept for the day they were made
+# (LSA_NO_GROK_CACHE=1 to bypass, e.g. after changing the prompt)
+CLASSIFY_CACHE = OUTPUT_DIR / ".classify_cache.sqlite"
+USE_CLASSIFY_CACHE = not os.environ.get("LSA_NO_GROK_CACHE")
+# Unmistakable voicemails skip Grok; LSA_ALWAYS_GROK=1 sends everything
+TRUST_KEYWORD_CLASSIFY = not os.environ.get("LSA_ALWAYS_GROK")
+
+# Transient Vapi errors are retried by the connection pool, honouring Retry-After
+# (GET/DELETE only - POSTs keep their own 429 loops so a call is never placed twice)
+HTTP_RETRY = Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                   respect_retry_after_header=True, raise_on_status=False)
+CALL_CREATE_ATTEMPTS = 5  # POST /call/phone tries while rate limited (429)
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # VAPI ASSISTANT CONFIGURATION
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -96,6 +156,177 @@ ASSISTANT_CONFIG = {
     "recordingEnabled": False
 }
 
+ASSISTANT_CONFIG_HASH = hashlib.sha256(json.dumps(ASSISTANT_CONFIG, sort_keys=True).encode()).hexdigest()
+
+
+def _api_key_hash(api_key: str) -> str:
+    """Identifies the Vapi account a cached assistant belongs to (the key itself isn't stored)."""
+    return hashlib.sha256(api_key.encode()).hexdigest()
+
+
+def load_cached_assistant_id(api_key: str) -> Optional[str]:
+    """Assistant ID from ASSISTANT_CACHE if it's fresh and matches ASSISTANT_CONFIG and the API key."""
+    try:
+        cached = json.loads(ASSISTANT_CACHE.read_text())
+    except (OSError, ValueError):
+        return None
+    if cached.get("config_hash") != ASSISTANT_CONFIG_HASH:
+        return None
+    if cached.get("key_hash") != _api_key_hash(api_key):
+        return None
+    if time.time() - cached.get("created", 0) > ASSISTANT_CACHE_TTL:
+        return None
+    return cached.get("id")
+
+
+def save_cached_assistant_id(assistant_id: str, api_key: str):
+    ASSISTANT_CACHE.write_text(json.dumps({
+        "id": assistant_id,
+        "config_hash": ASSISTANT_CONFIG_HASH,
+        "key_hash": _api_key_hash(api_key),
+        "created": time.time()
+    }))
+
+
+def drop_cached_assistant_id():
+    ASSISTANT_CACHE.unlink(missing_ok=True)
+
+
+# Fallback classifier phrases (lowercase). Scanned with plain `in` on purpose -
+# about 3x faster than one compiled regex alternation on typical transcripts
+DISCLAIMER_PHRASES = ("this call may be recorded", "this call is recorded", "this call will be recorded",
+                      "this call may be monitored", "for quality assurance", "for quality purposes",
+                      "for training purposes", "for quality and training")
+VOICEMAIL_WORDS = ("leave a message", "after the beep", "voicemail", "not available", "mailbox", "at the tone", "leave your name")
+# Real human interaction indicators (not disclaimers)
+LIVE_PERSON_WORDS = ("how may i help", "how can i help", "is anyone there", "hello?",
+                     "are you calling about", "what is your name", "can i get your name",
+                     "what is this regarding", "i'll transfer", "let me connect")
+# Strict subset for skipping Grok: a record-your-message cue, the call ending
+# the way voicemail calls end, and no sign of a live person
+VOICEMAIL_CUES = ("after the beep", "after the tone", "at the tone", "leave a message", "leave your name")
+VOICEMAIL_END_REASONS = ("voicemail", "silence-timed-out")
+KEYWORD_VOICEMAIL_RESULT = {
+    "answered_by": "voicemail",
+    "is_qualified": True,
+    "confidence": "high",
+    "notes": "Voicemail greeting, then silence (keyword classifier)"
+}
+
+# Outcomes the end reason alone decides - no transcript analysis needed
+END_REASON_RESULTS = {
+    "customer-did-not-answer": {
+        "answered_by": "no_answer",
+        "is_qualified": True,
+        "confidence": "high",
+        "notes": "NO ANSWER - QUALIFIED LEAD! 🎯"
+    },
+    "customer-busy": {
+        "answered_by": "busy",
+        "is_qualified": False,
+        "confidence": "high",
+        "notes": "Line busy - retry later"
+    },
+}
+
+SILENCE_RESULT = {
+    "answered_by": "no_answer",
+    "is_qualified": True,
+    "confidence": "high",
+    "notes": "Silence/No answer - QUALIFIED LEAD! 🎯"
+}
+
+_DIGIT_RUNS = re.compile(r"\d+")
+_BLANK_LINES = re.compile(r"\n{2,}")
+
+# Transcripts sent to Grok are capped: the first GROK_TRANSCRIPT_HEAD and last
+# GROK_TRANSCRIPT_TAIL characters carry the cues, the rest is just more tokens
+GROK_MAX_TRANSCRIPT = 1500
+GROK_TRANSCRIPT_HEAD = 1000
+GROK_TRANSCRIPT_TAIL = 500
+
+GROK_HEADERS = {
+    "Authorization": f"Bearer {XAI_API_KEY}",
+    "Content-Type": "application/json"
+}
+
+# Filled in per call with .format(transcript=..., end_reason=..., duration=...)
+GROK_PROMPT_TEMPLATE = """You are analyzing phone call transcripts. We called a personal injury law firm after hours using a SILENT AI caller that never speaks. Our goal is to audit whether a REAL LIVE PERSON eventually answers.
+
+IMPORTANT TRANSCRIPT FORMAT:
+- "bot:" lines = OUR silent AI caller (always empty/silent, ignore these)
+- "user:" lines = THE OTHER SIDE (the law firm's phone system or whoever picked up)
+- "...[truncated]..." = the middle of a long call was left out
+
+TRANSCRIPT:
+{transcript}
+
+CALL END REASON: {end_reason}
+CALL DURATION: {duration} seconds
+
+CRITICAL RULE ABOUT "THIS CALL MAY BE RECORDED":
+Phrases like "this call may be recorded", "this call is recorded", "this call will be recorded for quality purposes", "this call may be monitored" are just standard PRE-CALL DISCLAIMERS. They are automated messages that play BEFORE you get connected to anyone. By themselves they do NOT prove an answering service or live person answered. They are just legal disclaimers. Ignore them for classification purposes.
+
+Classify what answered the phone into exactly ONE category:
+
+1. voicemail - A RECORDED greeting followed by a beep/tone to leave a message. Key signs: "leave a message after the beep/tone", "please leave your name and number", "not available right now". The key indicator is that the greeting ends and waits for the caller to record a message.
+
+2. answering_service - A REAL LIVE PERSON picked up and interacted. The proof is HUMAN CONVERSATION: they ask questions ("how may I help you?", "what is your name?", "are you calling about a new case?"), they react to silence ("hello? is anyone there?"), they have back-and-forth dialogue. A named person answering ("this is Christina") is strong evidence. The key difference from voicemail: a live person RESPONDS and REACTS.
+
+3. human - A real employee or lawyer at the firm answered directly (same as answering_service for our purposes, but this is someone at the actual firm, not a third-party service).
+
+4. ivr_only - An automated phone tree menu ("press 1 for...", "press 2 for...") with no live person reached and no voicemail.
+
+5. no_answer - Nobody/nothing answered. Just ringing, silence, or the call disconnected. Also use this if the ONLY thing heard was a pre-call disclaimer ("this call may be recorded") with no human interaction after it.
+
+6. inconclusive - The call was too short or the transcript is too incomplete to determine what happened. Use this when only a pre-call disclaimer was heard and the call ended before we could tell if anyone would answer.
+
+Respond in EXACTLY this JSON format and nothing else:
+{{"answered_by": "category", "is_qualified": true/false, "confidence": "high/medium/low", "notes": "1-2 sentence explanation of what happened on the call"}}
+
+Qualification rules:
+- voicemail = TRUE (firm is missing calls - great lead!)
+- no_answer = TRUE (nobody picked up at all)
+- ivr_only = TRUE (automated menu, no human coverage)
+- inconclusive = TRUE (call ended too early, needs retry - but likely no live coverage)
+- answering_service = FALSE (firm has live phone coverage)
+- human = FALSE (firm has live phone coverage)"""
+
+
+def classify_cache_key(transcript: str, end_reason: str) -> str:
+    """Key under which transcripts differing only in case, spacing or numbers are equal."""
+    normalized = " ".join(_DIGIT_RUNS.sub("#", transcript.lower()).split())
+    return hashlib.sha256(f"{end_reason}\n{normalized}".encode()).hexdigest()
+
+
+def _classify_cache_db() -> sqlite3.Connection:
+    # Short-lived connections: classification runs in worker threads
+    conn = sqlite3.connect(CLASSIFY_CACHE)
+    conn.execute("CREATE TABLE IF NOT EXISTS classified "
+                 "(key TEXT PRIMARY KEY, day TEXT, result_json TEXT)")
+    return conn
+
+
+def load_cached_classification(key: str) -> Optional[Dict]:
+    """Today's cached classification for a transcript key, if any."""
+    with closing(_classify_cache_db()) as conn:
+        row = conn.execute("SELECT result_json FROM classified WHERE key = ? AND day = ?",
+                           (key, date.today().isoformat())).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def save_cached_classification(key: str, result: Dict):
+    with closing(_classify_cache_db()) as conn, conn:
+        conn.execute("INSERT OR REPLACE INTO classified VALUES (?, ?, ?)",
+                     (key, date.today().isoformat(), json.dumps(result)))
+
+
+def parse_json(response: requests.Response):
+    """Decode a response body, with orjson when it's installed (call records can be large)."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
 
 class VapiCaller:
     """Vapi.ai integration for smart audit calls."""
@@ -110,14 +341,33 @@ class VapiCaller:
             "Content-Type": "application/json"
         }
         self.assistant_id = None
+        
+        # One keep-alive session so polls, call setup and Grok requests reuse their TLS connections
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32,
+                                                   max_retries=HTTP_RETRY))
+        self.session.headers.update(self.headers)
     
     def create_assistant(self, force_new: bool = False) -> str:
         """Create or get the audit assistant."""
+        if self.assistant_id and not force_new:
+            return self.assistant_id
+        
+        if VAPI_ASSISTANT_ID and not force_new:
+            print(f"   Using assistant from VAPI_ASSISTANT_ID: {VAPI_ASSISTANT_ID}")
+            self.assistant_id = VAPI_ASSISTANT_ID
+            return VAPI_ASSISTANT_ID
+        
+        # Resolved on a previous run - no API round-trip needed
+        if not force_new:
+            cached_id = load_cached_assistant_id(self.api_key)
+            if cached_id:
+                print(f"   Using cached assistant: {cached_id}")
+                self.assistant_id = cached_id
+                return cached_id
+        
         # Check for existing assistants
-        response = requests.get(
-            f"{VAPI_BASE_URL}/assistant",
-            headers=self.headers
-        )
+        response = self.session.get(f"{VAPI_BASE_URL}/assistant")
         
         if response.status_code == 200 and not force_new:
             assistants = response.json()
@@ -125,30 +375,26 @@ class VapiCaller:
                 if asst.get("name") == "Stealth":
                     print(f"   Using existing assistant: {asst['id']}")
                     self.assistant_id = asst["id"]
+                    save_cached_assistant_id(self.assistant_id, self.api_key)
                     return asst["id"]
         
         # Delete ALL old assistants if forcing new
         if force_new and response.status_code == 200:
             assistants = response.json()
             print(f"   Deleting {len(assistants)} old assistants...")
-            for i, asst in enumerate(assistants):
-                resp_del = requests.delete(
-                    f"{VAPI_BASE_URL}/assistant/{asst['id']}",
-                    headers=self.headers
-                )
-                if resp_del.status_code == 429:
-                    print(f"   Rate limited, waiting 5s...")
-                    time.sleep(5)
-                    requests.delete(f"{VAPI_BASE_URL}/assistant/{asst['id']}", headers=self.headers)
-                if i % 5 == 4:
-                    time.sleep(1)  # Brief pause every 5 deletes
-            print(f"   Deleted all old assistants")
+            # In parallel over the pooled session, which backs off on 429s (honouring Retry-After)
+            with ThreadPoolExecutor(max_workers=DELETE_WORKERS) as pool:
+                responses = list(pool.map(
+                    lambda asst: self.session.delete(f"{VAPI_BASE_URL}/assistant/{asst['id']}"),
+                    assistants
+                ))
+            deleted = sum(r.status_code in [200, 204] for r in responses)
+            print(f"   Deleted {deleted}/{len(assistants)} old assistants")
         
         # Create new assistant with updated config (with retry for rate limits)
         for attempt in range(3):
-            response = requests.post(
+            response = self.session.post(
                 f"{VAPI_BASE_URL}/assistant",
-                headers=self.headers,
                 json=ASSISTANT_CONFIG
             )
             
@@ -156,6 +402,7 @@ class VapiCaller:
                 data = response.json()
                 self.assistant_id = data["id"]
                 print(f"   Created NEW assistant: {self.assistant_id}")
+                save_cached_assistant_id(self.assistant_id, self.api_key)
                 return self.assistant_id
             elif response.status_code == 429:
                 wait = 10 * (attempt + 1)
@@ -166,10 +413,16 @@ class VapiCaller:
         
         raise Exception("Failed to create assistant after 3 attempts (rate limited)")
     
-    def make_call(self, phone_number: str, business_name: str = "") -> Dict:
+    async def make_call(self, phone_number: str, business_name: str = "",
+                        limiter: RateLimiter = None, events: CallEvents = None,
+                        poller: "CallPoller" = None) -> Dict:
         """
         Make an audit call to a phone number.
         
+        With `events` (webhook mode) the result is pushed to us by Vapi; with
+        `poller` it's picked up by the shared poll loop; otherwise the call
+        is polled on its own until it ends.
+        
         Returns:
             Dict with call results including transcript and AI analysis
         """
@@ -192,17 +445,51 @@ class VapiCaller:
         # Add phone number ID (required for outbound calls)
         payload["phoneNumberId"] = VAPI_PHONE_ID
         
-        # Initiate call
-        response = requests.post(
-            f"{VAPI_BASE_URL}/call/phone",
-            headers=self.headers,
-            json=payload
-        )
+        if events is not None:
+            payload["assistantOverrides"] = {
+                "serverUrl": VAPI_SERVER_URL,
+                "serverMessages": ["end-of-call-report"],
+            }
+            if VAPI_SERVER_SECRET:
+                payload["assistantOverrides"]["serverUrlSecret"] = VAPI_SERVER_SECRET
+        
+        # Initiate call (requests is blocking, so it runs off the event loop).
+        # 429s are waited out here so the wait also holds back the other calls
+        # sharing the limiter, not just this one
+        for retries in range(CALL_CREATE_ATTEMPTS):
+            if limiter is not None:
+                await limiter.wait()
+            response = await asyncio.to_thread(self._create_call, payload)
+            if response.status_code != 429 or retries == CALL_CREATE_ATTEMPTS - 1:
+                break
+            wait = retry_after(response, default=2 ** retries)
+            print(f"   Rate limited, waiting {wait:.0f}s...")
+            if limiter is not None:
+                limiter.hold(wait)
+            else:
+                await asyncio.sleep(wait)
+        
+        # The assistant was deleted (or belongs to another account) - resolve a
+        # live one and retry once. Only the first call to notice re-resolves;
+        # the others just pick up the new ID
+        if self._is_bad_assistant(response):
+            if payload["assistantId"] == self.assistant_id:
+                print(f"   ⚠️ Assistant {self.assistant_id} was rejected, resolving it again...")
+                drop_cached_assistant_id()
+                self.assistant_id = None
+                self.create_assistant()
+            if payload["assistantId"] != self.assistant_id:
+                payload["assistantId"] = self.assistant_id
+                if limiter is not None:
+                    await limiter.wait()
+                response = await asyncio.to_thread(self._create_call, payload)
         
         if response.status_code not in [200, 201]:
             return {
                 "status": "error",
                 "error": response.text,
+                "http_status": response.status_code,
+                "retries": retries,
                 "phone": phone_number
             }
         
@@ -211,51 +498,102 @@ class VapiCaller:
         
         print(f"   📞 Call initiated: {call_id}")
         
-        # Poll for completion
-        result = self._wait_for_completion(call_id)
+        if events is not None:
+            result = await self._wait_for_report(call_id, events)
+        elif poller is not None:
+            poller.pending[call_id] = call_data.get("createdAt") or poller.started
+            try:
+                result = await self._wait_for_report(call_id, poller.events)
+            finally:
+                poller.pending.pop(call_id, None)
+        else:
+            result = await self._wait_for_completion(call_id)
         result["phone"] = phone_number
         result["business_name"] = business_name
+        result["retries"] = retries
         
         return result
     
-    def _wait_for_completion(self, call_id: str, timeout: int = 150) -> Dict:
+    @staticmethod
+    def _is_bad_assistant(response) -> bool:
+        """Whether POST /call/phone was rejected because of the assistant ID."""
+        return (400 <= response.status_code < 500 and response.status_code not in (402, 429)
+                and "assistant" in response.text.lower())
+    
+    def _create_call(self, payload: Dict):
+        """
+        POST /call/phone once.
+        
+        Errors aren't retried here - make_call waits out 429s, and after a
+        5xx the call may already exist.
+        """
+        return self.session.post(f"{VAPI_BASE_URL}/call/phone", json=payload)
+    
+    async def _wait_for_report(self, call_id: str, events: CallEvents) -> Dict:
+        """Wait for Vapi to push the end-of-call report."""
+        try:
+            call = await events.wait(call_id, CALL_TIMEOUT)
+            # Classification may call out to Grok, so it runs off the event loop
+            return await asyncio.to_thread(self._analyze_call, call)
+        except asyncio.TimeoutError:
+            # Report never arrived - check the call once directly
+            call = await self._fetch_call(call_id)
+            if call and call.get("status") in ["ended", "failed"]:
+                return await asyncio.to_thread(self._analyze_call, call)
+            return {"status": "timeout", "call_id": call_id}
+    
+    async def _fetch_call(self, call_id: str) -> Optional[Dict]:
+        """GET a call's current state; None if the request didn't return one."""
+        try:
+            response = await asyncio.to_thread(
+                self.session.get,
+                f"{VAPI_BASE_URL}/call/{call_id}",
+                timeout=10
+            )
+            
+            # Guard against errors and empty responses
+            if response.status_code != 200 or not response.text or not response.text.strip():
+                return None
+            
+            return parse_json(response)
+        
+        except (requests.exceptions.JSONDecodeError, requests.exceptions.ConnectionError, 
+                requests.exceptions.Timeout, Exception) as e:
+            print(f"      ⚠️ Poll error: {e}, retrying...")
+            return None
+    
+    async def _list_calls(self, created_since: str) -> Optional[List[Dict]]:
+        """Calls placed from our number since an ISO timestamp; None if the request failed."""
+        try:
+            response = await asyncio.to_thread(
+                self.session.get,
+                f"{VAPI_BASE_URL}/call",
+                params={"phoneNumberId": VAPI_PHONE_ID, "createdAtGe": created_since, "limit": 100},
+                timeout=10
+            )
+            if response.status_code != 200:
+                return None
+            calls = parse_json(response)
+            return calls if isinstance(calls, list) else None
+        
+        except Exception as e:
+            print(f"      ⚠️ Poll error: {e}, retrying...")
+            return None
+    
+    async def _wait_for_completion(self, call_id: str, timeout: int = CALL_TIMEOUT) -> Dict:
         """Wait for call to complete and get results."""
-        start_time = time.time()
-        poll_interval = 2  # Start fast
+        # Poll quickly at first so short no-answer calls resolve fast,
+        # then back off to POLL_MAX_DELAY
+        delay = POLL_INITIAL_DELAY
+        deadline = time.monotonic() + timeout
         
-        while time.time() - start_time < timeout:
-            try:
-                response = requests.get(
-                    f"{VAPI_BASE_URL}/call/{call_id}",
-                    headers=self.headers,
-                    timeout=10
-                )
-                
-                if response.status_code != 200:
-                    time.sleep(2)
-                    continue
-                
-                # Guard against empty responses
-                if not response.text or not response.text.strip():
-                    time.sleep(2)
-                    continue
-                
-                call = response.json()
-                status = call.get("status")
-                
-                if status in ["ended", "failed"]:
-                    return self._analyze_call(call)
-                
-            except (requests.exceptions.JSONDecodeError, requests.exceptions.ConnectionError, 
-                    requests.exceptions.Timeout, Exception) as e:
-                print(f"      ⚠️ Poll error: {e}, retrying...")
-                time.sleep(3)
-                continue
+        while time.monotonic() < deadline:
+            await asyncio.sleep(delay)
+            delay = min(delay * 1.5, POLL_MAX_DELAY)
             
-            time.sleep(poll_interval)
-            # After 30s, slow down polling slightly
-            if time.time() - start_time > 30:
-                poll_interval = 3
+            call = await self._fetch_call(call_id)
+            if call and call.get("status") in ["ended", "failed"]:
+                return await asyncio.to_thread(self._analyze_call, call)
         
         return {"status": "timeout", "call_id": call_id}
     
@@ -269,13 +607,12 @@ class VapiCaller:
         recording_url = call.get("recordingUrl", "")
         end_reason = call.get("endedReason", "unknown")
         
-        # Build full transcript text
-        transcript_text = ""
-        for msg in messages:
-            role = msg.get("role", "")
-            content = msg.get("content", "") or msg.get("message", "")
-            if content:
-                transcript_text += f"{role}: {content}\n"
+        # Build full transcript text (one join - calls can have hundreds of partials)
+        transcript_text = "".join(
+            f"{msg.get('role', '')}: {content}\n"
+            for msg in messages or ()
+            if (content := msg.get("content", "") or msg.get("message", ""))
+        )
         
         # AI Analysis - determine what answered
         analysis = self._classify_response(transcript_text, end_reason, duration)
@@ -292,11 +629,12 @@ class VapiCaller:
             lines = [l for l in transcript_text.strip().split('\n') if l.strip()]
             summary_parts.append(f"Transcript lines: {len(lines)}")
         
-        if "press" in transcript_text.lower() or "menu" in transcript_text.lower():
+        transcript_lower = transcript_text.lower()
+        if "press" in transcript_lower or "menu" in transcript_lower:
             summary_parts.append("Had IVR/phone menu")
-        if "leave" in transcript_text.lower() and "message" in transcript_text.lower():
+        if "leave" in transcript_lower and "message" in transcript_lower:
             summary_parts.append("Hit voicemail prompt")
-        if "answering service" in transcript_text.lower() or "how can i help" in transcript_text.lower():
+        if "answering service" in transcript_lower or "how can i help" in transcript_lower:
             summary_parts.append("Answering service picked up")
             
         analysis["summary"] = " | ".join(summary_parts)
@@ -314,100 +652,62 @@ class VapiCaller:
     def _classify_response(self, transcript: str, end_reason: str, duration: int) -> Dict:
         """Classify what answered the call using Grok 4 Fast reasoning."""
         
-        # FIRST: Check end_reason for obvious cases
-        if end_reason == "customer-did-not-answer":
-            return {
-                "answered_by": "no_answer",
-                "is_qualified": True,
-                "confidence": "high",
-                "notes": "NO ANSWER - QUALIFIED LEAD! 🎯"
-            }
-        
-        if end_reason == "customer-busy":
-            return {
-                "answered_by": "busy",
-                "is_qualified": False,
-                "confidence": "high",
-                "notes": "Line busy - retry later"
-            }
+        # FIRST: Check end_reason for obvious cases (copies - callers add a summary)
+        if end_reason in END_REASON_RESULTS:
+            return dict(END_REASON_RESULTS[end_reason])
         
         # Strip out the system prompt from transcript before analyzing
-        user_transcript = ""
-        if transcript:
-            lines = transcript.strip().split('\n')
+        user_transcript = transcript.strip() if transcript else ""
+        if "system:" in user_transcript:
+            lines = user_transcript.split('\n')
             user_lines = [l for l in lines if not l.startswith("system:")]
             user_transcript = '\n'.join(user_lines).strip()
         
         # If no meaningful transcript, it's silence/no answer
-        if not user_transcript or len(user_transcript) < 10:
-            return {
-                "answered_by": "no_answer",
-                "is_qualified": True,
-                "confidence": "high",
-                "notes": "Silence/No answer - QUALIFIED LEAD! 🎯"
-            }
+        if len(user_transcript) < 10:
+            return dict(SILENCE_RESULT)
+        
+        # Unmistakable voicemails don't need a Grok round-trip
+        if TRUST_KEYWORD_CLASSIFY and end_reason in VOICEMAIL_END_REASONS:
+            lowered = user_transcript.lower()
+            if (any(w in lowered for w in VOICEMAIL_CUES)
+                    and not any(w in lowered for w in LIVE_PERSON_WORDS)):
+                return dict(KEYWORD_VOICEMAIL_RESULT)
+        
+        # Shared voicemail/IVR scripts come up again and again - reuse today's verdict
+        cache_key = classify_cache_key(user_transcript, end_reason)
+        cached = load_cached_classification(cache_key) if USE_CLASSIFY_CACHE else None
+        if cached:
+            return dict(cached, confidence="cached")
         
         # Use Grok 4 Fast to classify
         try:
-            return self._grok_classify(user_transcript, end_reason, duration)
+            result = self._grok_classify(user_transcript, end_reason, duration)
         except Exception as e:
             print(f"      ⚠️ Grok classification failed: {e}, using fallback")
             return self._fallback_classify(user_transcript, end_reason, duration)
+        
+        if USE_CLASSIFY_CACHE:
+            save_cached_classification(cache_key, result)
+        return result
     
     def _grok_classify(self, transcript: str, end_reason: str, duration: int) -> Dict:
         """Use Grok 4 Fast reasoning to classify the call."""
-        import os
-        
-        xai_key = os.environ.get("XAI_API_KEY", "")
-        if not xai_key:
+        if not XAI_API_KEY:
             raise ValueError("XAI_API_KEY not set")
         
-        prompt = f"""You are analyzing phone call transcripts. We called a personal injury law firm after hours using a SILENT AI caller that never speaks. Our goal is to audit whether a REAL LIVE PERSON eventually answers.
-
-IMPORTANT TRANSCRIPT FORMAT:
-- "bot:" lines = OUR silent AI caller (always empty/silent, ignore these)
-- "user:" lines = THE OTHER SIDE (the law firm's phone system or whoever picked up)
-
-TRANSCRIPT:
-{transcript}
-
-CALL END REASON: {end_reason}
-CALL DURATION: {duration} seconds
-
-CRITICAL RULE ABOUT "THIS CALL MAY BE RECORDED":
-Phrases like "this call may be recorded", "this call is recorded", "this call will be recorded for quality purposes", "this call may be monitored" are just standard PRE-CALL DISCLAIMERS. They are automated messages that play BEFORE you get connected to anyone. By themselves they do NOT prove an answering service or live person answered. They are just legal disclaimers. Ignore them for classification purposes.
-
-Classify what answered the phone into exactly ONE category:
-
-1. voicemail - A RECORDED greeting followed by a beep/tone to leave a message. Key signs: "leave a message after the beep/tone", "please leave your name and number", "not available right now". The key indicator is that the greeting ends and waits for the caller to record a message.
-
-2. answering_service - A REAL LIVE PERSON picked up and interacted. The proof is HUMAN CONVERSATION: they ask questions ("how may I help you?", "what is your name?", "are you calling about a new case?"), they react to silence ("hello? is anyone there?"), they have back-and-forth dialogue. A named person answering ("this is Christina") is strong evidence. The key difference from voicemail: a live person RESPONDS and REACTS.
-
-3. human - A real employee or lawyer at the firm answered directly (same as answering_service for our purposes, but this is someone at the actual firm, not a third-party service).
-
-4. ivr_only - An automated phone tree menu ("press 1 for...", "press 2 for...") with no live person reached and no voicemail.
-
-5. no_answer - Nobody/nothing answered. Just ringing, silence, or the call disconnected. Also use this if the ONLY thing heard was a pre-call disclaimer ("this call may be recorded") with no human interaction after it.
-
-6. inconclusive - The call was too short or the transcript is too incomplete to determine what happened. Use this when only a pre-call disclaimer was heard and the call ended before we could tell if anyone would answer.
-
-Respond in EXACTLY this JSON format and nothing else:
-{{"answered_by": "category", "is_qualified": true/false, "confidence": "high/medium/low", "notes": "1-2 sentence explanation of what happened on the call"}}
-
-Qualification rules:
-- voicemail = TRUE (firm is missing calls - great lead!)
-- no_answer = TRUE (nobody picked up at all)
-- ivr_only = TRUE (automated menu, no human coverage)
-- inconclusive = TRUE (call ended too early, needs retry - but likely no live coverage)
-- answering_service = FALSE (firm has live phone coverage)
-- human = FALSE (firm has live phone coverage)"""
+        # Long calls keep their start (greeting / IVR / voicemail cue) and their end
+        transcript = _BLANK_LINES.sub("\n", transcript)
+        if len(transcript) > GROK_MAX_TRANSCRIPT:
+            transcript = (transcript[:GROK_TRANSCRIPT_HEAD] + "\n...[truncated]...\n"
+                          + transcript[-GROK_TRANSCRIPT_TAIL:])
+        
+        prompt = GROK_PROMPT_TEMPLATE.format(transcript=transcript, end_reason=end_reason, duration=duration)
 
-        resp = requests.post(
+        # Same pooled session as the Vapi requests (these headers override its Vapi auth)
+        resp = self.session.post(
             "https://api.x.ai/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {xai_key}",
-                "Content-Type": "application/json"
-            },
+            headers=GROK_HEADERS,
             json={
                 "model": "grok-3-fast",
                 "messages": [{"role": "user", "content": prompt}],
@@ -440,26 +740,15 @@ Qualification rules:
     
     def _fallback_classify(self, transcript: str, end_reason: str, duration: int) -> Dict:
         """Simple fallback if Grok is unavailable."""
-        transcript_lower = transcript.lower()
-        
         # These are just disclaimers - strip them out before analyzing
-        disclaimer_phrases = ["this call may be recorded", "this call is recorded", "this call will be recorded",
-                              "this call may be monitored", "for quality assurance", "for quality purposes",
-                              "for training purposes", "for quality and training"]
-        cleaned = transcript_lower
-        for phrase in disclaimer_phrases:
+        cleaned = transcript.lower()
+        for phrase in DISCLAIMER_PHRASES:
             cleaned = cleaned.replace(phrase, "")
         cleaned = cleaned.strip()
         
-        voicemail_words = ["leave a message", "after the beep", "voicemail", "not available", "mailbox", "at the tone", "leave your name"]
-        # Real human interaction indicators (not disclaimers)
-        live_person_words = ["how may i help", "how can i help", "is anyone there", "hello?",
-                             "are you calling about", "what is your name", "can i get your name",
-                             "what is this regarding", "i'll transfer", "let me connect"]
-        
-        if any(w in cleaned for w in live_person_words):
+        if any(w in cleaned for w in LIVE_PERSON_WORDS):
             return {"answered_by": "answering_service", "is_qualified": False, "confidence": "medium", "notes": "Live person detected (fallback classifier)"}
-        elif any(w in cleaned for w in voicemail_words):
+        elif any(w in cleaned for w in VOICEMAIL_WORDS):
             return {"answered_by": "voicemail", "is_qualified": True, "confidence": "medium", "notes": "Voicemail detected (fallback classifier)"}
         elif not cleaned or len(cleaned) < 10:
             return {"answered_by": "inconclusive", "is_qualified": True, "confidence": "low", "notes": "Only disclaimers heard, call ended too early (fallback) - retry needed"}
@@ -467,139 +756,221 @@ Qualification rules:
             return {"answered_by": "unknown", "is_qualified": False, "confidence": "low", "notes": "Could not classify (fallback) - manual review needed"}
 
 
+class CallPoller:
+    """
+    Polls every in-flight call with one list request per tick (instead of
+    one GET per call per tick) and hands finished calls to CallEvents.
+    """
+    
+    def __init__(self, caller: VapiCaller):
+        self.caller = caller
+        self.events = CallEvents()
+        # call_id -> createdAt (ISO); the oldest bounds the list request
+        self.pending = {}
+        self.started = datetime.now(timezone.utc).isoformat()
+    
+    async def run(self):
+        """Poll until cancelled."""
+        while True:
+            await asyncio.sleep(POLL_TICK)
+            if self.pending:
+                await self.poll()
+    
+    async def poll(self):
+        ids = list(self.pending)
+        listed = await self.caller._list_calls(min(self.pending.values()))
+        if listed is not None:
+            # Only finished calls need their full record (messages etc.), plus
+            # any call the list left out (it's capped at 100) - checked directly
+            listed_ids = {c.get("id") for c in listed}
+            missing = [call_id for call_id in ids if call_id not in listed_ids]
+            ids = [c.get("id") for c in listed
+                   if c.get("id") in self.pending and c.get("status") in ["ended", "failed"]]
+            ids += missing
+        # Without the list endpoint, fall back to one GET per call, all at once
+        calls = await asyncio.gather(*(self.caller._fetch_call(call_id) for call_id in ids))
+        
+        for call in calls:
+            if call and call.get("status") in ["ended", "failed"]:
+                self.pending.pop(call["id"], None)
+                self.events.resolve(call["id"], call)
+
+
 # Also add helper to show nice summary
 
 
-def load_leads(file_path: str = None) -> List[Dict]:
-    """Load leads from phone list file."""
+def load_leads(file_path: str = None) -> Optional[Iterator[Dict]]:
+    """
+    Stream leads from phone list file (the most recent one by default).
+    
+    Rows are parsed as they're consumed, so an audit with --limit stops
+    reading once it has enough leads. None if there's no phone list.
+    """
     if file_path:
         fp = Path(file_path)
     else:
         # Find most recent
         files = sorted(OUTPUT_DIR.glob("*_phones.txt"), reverse=True)
         if not files:
-            return []
+            return None
         fp = files[0]
     
     print(f"📂 Loading leads from: {fp}")
-    
-    leads = []
-    with open(fp, 'r') as f:
-        for line in f:
-            line = line.strip()
-            if not line or line.startswith('#'):
+    return _read_leads(fp)
+
+
+def _read_leads(fp: Path) -> Iterator[Dict]:
+    with open(fp, 'r', newline='') as f:
+        # Tab-separated, no quoting (names may contain quotes)
+        for row in csv.reader(f, delimiter='\t', quoting=csv.QUOTE_NONE):
+            if len(row) < 2 or not row[0].strip() or row[0].lstrip().startswith('#'):
                 continue
             
-            parts = line.split('\t')
-            if len(parts) >= 2:
-                leads.append({
-                    'phone': parts[0],
-                    'name': parts[1],
-                    'location': parts[2] if len(parts) > 2 else '',
-                    'is_24h': '24/7' in line or '24 hour' in line.lower()
-                })
-    
-    return leads
+            yield {
+                'phone': row[0].strip(),
+                'name': row[1].strip(),
+                'location': row[2].strip() if len(row) > 2 else '',
+                'is_24h': any(_IS_24H(field) for field in row)
+            }
 
 
-def save_results(results: List[Dict], filename: str = None):
-    """Save call results to CSV and JSON with PST timestamps."""
-    if not results:
-        return
+# Main CSV - all calls with full details
+RESULT_HEADER = [
+    'call_time_pst',      # When call was made (PST)
+    'business_name',       # Company name
+    'phone',               # Phone number
+    'location',            # City, State
+    'claims_24_7',         # Do they advertise 24/7?
+    'result',              # voicemail/human/no_answer/answering_service
+    'qualified_lead',      # TRUE = no one answered = potential sale
+    'duration_sec',        # Call length
+    'summary',             # What happened step by step
+    'transcript',          # Full transcript of what was heard
+    'notes'                # AI analysis
+]
+
+# QUALIFIED CSV - hot prospects ready to sell to!
+QUALIFIED_HEADER = [
+    'call_time_pst', 'business_name', 'phone', 'location',
+    'claims_24_7', 'what_happened', 'sales_pitch'
+]
+
+
+def sales_pitch(claims_24: bool, what: str) -> str:
+    """Generate sales pitch based on findings."""
+    if claims_24 and what in ['voicemail', 'no_answer']:
+        return "You claim 24/7 but we called and got voicemail - you're losing emergency jobs!"
+    elif what == 'voicemail':
+        return "Your after-hours calls go to voicemail - potential customers are calling competitors"
+    return "No live answer after hours - we can fix that"
+
+
+def dump_json(obj) -> bytes:
+    """Serialize a result to UTF-8 JSON, with orjson when it's installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str).encode()
+
+
+class AuditLog:
+    """
+    Append-only audit output with PST timestamps: each finished call is
+    written to the main CSV, the raw-data JSONL and (when qualified) the
+    QUALIFIED CSV, and synced to disk so nothing is lost on a crash.
+    """
+    
+    def __init__(self, filename: str = None):
+        timestamp = datetime.now(PST).strftime("%Y%m%d_%H%M%S")
+        prefix = filename or f"audit_{timestamp}"
+        self.csv_file = OUTPUT_DIR / f"{prefix}.csv"
+        self.jsonl_file = OUTPUT_DIR / f"{prefix}.jsonl"
+        self.qual_file = OUTPUT_DIR / f"{prefix}_QUALIFIED.csv"
+        
+        self._csv = open(self.csv_file, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._csv)
+        self._writer.writerow(RESULT_HEADER)
+        self._jsonl = open(self.jsonl_file, 'wb')
+        # Only created once there's a qualified lead to put in it
+        self._qual = None
+        self._qual_writer = None
     
-    now_pst = datetime.now(PST)
-    timestamp = now_pst.strftime("%Y%m%d_%H%M%S")
-    prefix = filename or f"audit_{timestamp}"
-    
-    # ═══════════════════════════════════════════════════════════════════════════
-    # MAIN CSV - All calls with full details
-    # ═══════════════════════════════════════════════════════════════════════════
-    csv_file = OUTPUT_DIR / f"{prefix}.csv"
-    with open(csv_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerow([
-            'call_time_pst',      # When call was made (PST)
-            'business_name',       # Company name
-            'phone',               # Phone number
-            'location',            # City, State
-            'claims_24_7',         # Do they advertise 24/7?
-            'result',              # voicemail/human/no_answer/answering_service
-            'qualified_lead',      # TRUE = no one answered = potential sale
-            'duration_sec',        # Call length
-            'summary',             # What happened step by step
-            'transcript',          # Full transcript of what was heard
-            'notes'                # AI analysis
+    def append(self, r: Dict):
+        """Write a single finished call."""
+        call_time = datetime.now(PST).strftime("%Y-%m-%d %I:%M %p PST")
+        analysis = r.get('analysis', {})
+        claims_24 = r.get('is_24h', False)
+        what = analysis.get('answered_by', 'unknown')
+        
+        self._writer.writerow([
+            call_time,
+            r.get('business_name', ''),
+            r.get('phone', ''),
+            r.get('location', ''),
+            'YES' if claims_24 else 'NO',
+            what,
+            'TRUE' if analysis.get('is_qualified') else 'FALSE',
+            r.get('duration_seconds', ''),
+            analysis.get('summary', ''),
+            r.get('transcript', '').strip(),
+            analysis.get('notes', '')
         ])
+        self._jsonl.write(dump_json(r) + b"\n")
+        files = [self._csv, self._jsonl]
         
-        for r in results:
-            analysis = r.get('analysis', {})
-            writer.writerow([
-                now_pst.strftime("%Y-%m-%d %I:%M %p PST"),
+        if analysis.get('is_qualified'):
+            if self._qual is None:
+                self._qual = open(self.qual_file, 'w', newline='', encoding='utf-8')
+                self._qual_writer = csv.writer(self._qual)
+                self._qual_writer.writerow(QUALIFIED_HEADER)
+            self._qual_writer.writerow([
+                call_time,
                 r.get('business_name', ''),
                 r.get('phone', ''),
                 r.get('location', ''),
-                'YES' if r.get('is_24h') else 'NO',
-                analysis.get('answered_by', 'unknown'),
-                'TRUE' if analysis.get('is_qualified') else 'FALSE',
-                r.get('duration_seconds', ''),
-                analysis.get('summary', ''),
-                r.get('transcript', '').strip(),
-                analysis.get('notes', '')
+                'YES' if claims_24 else 'NO',
+                what,
+                sales_pitch(claims_24, what)
             ])
+            files.append(self._qual)
+        
+        for f in files:
+            f.flush()
+            os.fsync(f.fileno())
     
-    # JSON (full data for debugging)
-    json_file = OUTPUT_DIR / f"{prefix}.json"
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, default=str)
-    
-    # ═══════════════════════════════════════════════════════════════════════════
-    # QUALIFIED LEADS - Hot prospects ready to sell to!
-    # ═══════════════════════════════════════════════════════════════════════════
-    qualified = [r for r in results if r.get('analysis', {}).get('is_qualified')]
-    if qualified:
-        qual_file = OUTPUT_DIR / f"{prefix}_QUALIFIED.csv"
-        with open(qual_file, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                'call_time_pst', 'business_name', 'phone', 'location', 
-                'claims_24_7', 'what_happened', 'sales_pitch'
-            ])
-            for r in qualified:
-                analysis = r.get('analysis', {})
-                claims_24 = r.get('is_24h', False)
-                what = analysis.get('answered_by', 'unknown')
-                
-                # Generate sales pitch based on findings
-                if claims_24 and what in ['voicemail', 'no_answer']:
-                    pitch = "You claim 24/7 but we called and got voicemail - you're losing emergency jobs!"
-                elif what == 'voicemail':
-                    pitch = "Your after-hours calls go to voicemail - potential customers are calling competitors"
-                else:
-                    pitch = "No live answer after hours - we can fix that"
-                
-                writer.writerow([
-                    now_pst.strftime("%Y-%m-%d %I:%M %p PST"),
-                    r.get('business_name', ''),
-                    r.get('phone', ''),
-                    r.get('location', ''),
-                    'YES' if claims_24 else 'NO',
-                    what,
-                    pitch
-                ])
-        print(f"   🎯 QUALIFIED: {qual_file}")
-    
-    print(f"   📄 All results: {csv_file}")
-    print(f"   📄 Raw data: {json_file}")
-
-
-def run_audit(
-    leads: List[Dict],
+    def close(self):
+        self._csv.close()
+        self._jsonl.close()
+        if self._qual is not None:
+            self._qual.close()
+            print(f"   🎯 QUALIFIED: {self.qual_file}")
+        print(f"   📄 All results: {self.csv_file}")
+        print(f"   📄 Raw data: {self.jsonl_file}")
+
+
+def open_called_db() -> sqlite3.Connection:
+    """Open (creating if needed) the index of numbers already called."""
+    conn = sqlite3.connect(CALLED_DB)
+    conn.execute("CREATE TABLE IF NOT EXISTS called "
+                 "(phone TEXT PRIMARY KEY, last_called_ts INTEGER, outcome TEXT)")
+    return conn
+
+
+async def run_audit(
+    leads: Iterable[Dict],
     limit: int = 10,
     only_24h: bool = False,
     delay: int = 5,
-    force_new_ai: bool = False
+    force_new_ai: bool = False,
+    concurrency: int = MAX_CONCURRENT_CALLS,
+    recall: bool = False
 ):
-    """Run the audit calls."""
+    """
+    Run the audit calls.
+    
+    Up to concurrency calls are in flight at once; call starts are spaced
+    at least delay seconds apart. Numbers called in the last RECALL_AFTER
+    seconds are skipped unless recall is set.
+    """
     
     if not VAPI_API_KEY:
         print("\n❌ VAPI_API_KEY not set!")
@@ -625,11 +996,36 @@ def run_audit(
     print("\n🤖 Setting up AI assistant...")
     caller.create_assistant(force_new=force_new_ai)
     
-    # Filter leads
+    # Filter leads (before the limit, so it counts only calls we'll make)
     if only_24h:
-        leads = [l for l in leads if l.get('is_24h')]
+        leads = (l for l in leads if l.get('is_24h'))
+    
+    called_db = open_called_db()
+    called = set()
+    if not recall:
+        cutoff = int(time.time()) - RECALL_AFTER
+        called = {row[0] for row in called_db.execute(
+            "SELECT phone FROM called WHERE last_called_ts > ?", (cutoff,))}
+    
+    # Take leads until the limit is reached - the rest of the list is never read
+    picked = []
+    skipped = 0
+    for lead in leads:
+        if len(picked) == limit:
+            break
+        if lead['phone'] in called:
+            skipped += 1
+        else:
+            picked.append(lead)
+    if skipped:
+        print(f"   Skipped {skipped} numbers called in the last "
+              f"{RECALL_AFTER // 86400} days (--recall to include them)")
     
-    leads = leads[:limit]
+    leads = picked
+    if not leads:
+        print("\n❌ No leads left to call")
+        called_db.close()
+        return
     
     print(f"\n{'='*60}")
     print(f"📞 NIGHTLINE AI AUDIT CALLER")
@@ -637,64 +1033,115 @@ def run_audit(
     print(f"   Time: {datetime.now().strftime('%I:%M %p %A')}")
     print(f"   Leads to call: {len(leads)}")
     print(f"   AI: GPT-4o + Voice")
+    print(f"   Concurrent calls: {concurrency}")
     print(f"{'='*60}\n")
     
-    results = []
-    stats = {'total': 0, 'qualified': 0, 'answered': 0, 'service': 0, 'failed': 0}
+    stats = {'total': 0, 'qualified': 0, 'answered': 0, 'service': 0, 'failed': 0, 'not_placed': 0}
+    
+    # Webhook mode: receive end-of-call reports instead of polling
+    events = None
+    server = None
+    if VAPI_SERVER_URL:
+        import uvicorn
+        events = CallEvents()
+        server = uvicorn.Server(uvicorn.Config(
+            create_vapi_webhook_app(events, VAPI_SERVER_SECRET), host="0.0.0.0", port=WEBHOOK_PORT, log_level="warning",
+        ))
+        server_task = asyncio.create_task(server.serve())
+        print(f"   🔔 Listening for Vapi webhooks on :{WEBHOOK_PORT} ({VAPI_SERVER_URL})")
+    
+    # Otherwise one shared loop polls every in-flight call per tick
+    poller = None
+    if events is None:
+        poller = CallPoller(caller)
+        poll_task = asyncio.create_task(poller.run())
+    
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(delay)
+    # Every result goes straight to disk as its call finishes - via a single
+    # writer task, so calls in flight never wait on file I/O
+    audit_log = AuditLog()
+    finished = asyncio.Queue()
     
-    for i, lead in enumerate(leads, 1):
-        print(f"\n[{i}/{len(leads)}] 📞 {lead['name']}")
-        print(f"   Phone: {lead['phone']}")
-        print(f"   Location: {lead.get('location', 'N/A')}")
+    out_of_credits = False
+    
+    async def call_lead(i, lead):
+        nonlocal out_of_credits
+        async with semaphore:
+            if out_of_credits:
+                return
+            try:
+                result = await caller.make_call(lead['phone'], lead['name'], limiter, events, poller)
+            except Exception as e:
+                print(f"   ❌ Call failed: {e}")
+                result = {"status": "error", "error": str(e), "phone": lead['phone'], "business_name": lead['name']}
         
-        try:
-            result = caller.make_call(lead['phone'], lead['name'])
-        except Exception as e:
-            print(f"   ❌ Call failed: {e}")
-            result = {"status": "error", "error": str(e), "phone": lead['phone'], "business_name": lead['name']}
+        # Out of Vapi credits - every remaining call would fail the same way
+        if result.get('http_status') == 402:
+            if not out_of_credits:
+                print(f"\n❌ Vapi account is out of credits - stopping the audit")
+            out_of_credits = True
+            return
         
         result['location'] = lead.get('location', '')
         result['is_24h'] = lead.get('is_24h', False)
-        results.append(result)
-        
-        # Show result
-        analysis = result.get('analysis', {})
-        answered_by = analysis.get('answered_by', 'unknown')
-        is_qualified = analysis.get('is_qualified', False)
-        
-        stats['total'] += 1
-        
-        summary = analysis.get('summary', '')
-        if is_qualified:
-            print(f"   ✅ QUALIFIED - {analysis.get('notes', '')}")
-            print(f"      {summary}")
-            stats['qualified'] += 1
-        elif answered_by == 'human':
-            print(f"   👤 Human answered")
-            print(f"      {summary}")
-            stats['answered'] += 1
-        elif answered_by == 'answering_service':
-            print(f"   🏢 Answering service")
-            print(f"      {summary}")
-            stats['service'] += 1
-        else:
-            print(f"   ❓ {answered_by}")
-            print(f"      {summary}")
-            stats['failed'] += 1
-        
-        # Auto-save every 25 calls so we don't lose progress
-        if i % 25 == 0:
-            print(f"\n   💾 Auto-saving progress ({i}/{len(leads)})...")
-            save_results(results)
-        
-        # Delay between calls
-        if i < len(leads):
-            print(f"   ⏳ Waiting {delay}s...")
-            time.sleep(delay)
+        finished.put_nowait((i, lead, result))
     
-    # Final save
-    print(f"\n💾 Saving final results...")
-    save_results(results)
+    async def write_results():
+        while (item := await finished.get()) is not None:
+            i, lead, result = item
+            print(f"\n[{i}/{len(leads)}] 📞 {lead['name']}")
+            print(f"   Phone: {lead['phone']}")
+            print(f"   Location: {lead.get('location', 'N/A')}")
+            
+            await asyncio.to_thread(audit_log.append, result)  # fsyncs
+            
+            # Show result
+            analysis = result.get('analysis', {})
+            answered_by = analysis.get('answered_by', 'unknown')
+            
+            placed = result.get('status') != 'error'
+            if placed:
+                called_db.execute("INSERT OR REPLACE INTO called VALUES (?, ?, ?)",
+                                  (lead['phone'], int(time.time()), answered_by))
+                called_db.commit()
+            is_qualified = analysis.get('is_qualified', False)
+            
+            stats['total'] += 1
+            
+            summary = analysis.get('summary', '')
+            if is_qualified:
+                print(f"   ✅ QUALIFIED - {analysis.get('notes', '')}")
+                print(f"      {summary}")
+                stats['qualified'] += 1
+            elif answered_by == 'human':
+                print(f"   👤 Human answered")
+                print(f"      {summary}")
+                stats['answered'] += 1
+            elif answered_by == 'answering_service':
+                print(f"   🏢 Answering service")
+                print(f"      {summary}")
+                stats['service'] += 1
+            else:
+                print(f"   ❓ {answered_by}")
+                print(f"      {summary}")
+                stats['failed' if placed else 'not_placed'] += 1
+    
+    writer = asyncio.create_task(write_results())
+    try:
+        await asyncio.gather(*(call_lead(i, lead) for i, lead in enumerate(leads, 1)))
+    finally:
+        # Let the writer drain every finished call before closing its files
+        finished.put_nowait(None)
+        await writer
+        print(f"\n💾 Results saved:")
+        audit_log.close()
+        called_db.close()
+        if server is not None:
+            server.should_exit = True
+            await server_task
+        if poller is not None:
+            poll_task.cancel()
     
     # Summary
     print(f"\n{'='*60}")
@@ -704,6 +1151,8 @@ def run_audit(
     print(f"   Human answered: {stats['answered']}")
     print(f"   Answering service: {stats['service']}")
     print(f"   Failed/Unknown: {stats['failed']}")
+    if stats['not_placed']:
+        print(f"   ⚠️  {stats['not_placed']} calls couldn't be placed - they'll be retried next run")
     print(f"{'='*60}")
     print(f"   🎯 QUALIFIED LEADS: {stats['qualified']} ({stats['qualified']/max(stats['total'],1)*100:.0f}%)")
     print(f"{'='*60}")
@@ -716,12 +1165,15 @@ def run_audit(
 def main():
     parser = argparse.ArgumentParser(description="Vapi AI Audit Caller")
     parser.add_argument("--test", action="store_true", help="Test with 1 call")
-    parser.add_argument("--phone", type=str, help="Call specific number")
+    parser.add_argument("--phone", type=str, help="Call specific number (uses VAPI_ASSISTANT_ID when set)")
     parser.add_argument("--limit", type=int, default=10, help="Max calls")
     parser.add_argument("--24-only", dest="only_24h", action="store_true", help="Only 24/7 businesses")
-    parser.add_argument("--delay", type=int, default=5, help="Seconds between calls")
+    parser.add_argument("--delay", type=int, default=5, help="Seconds between call starts")
+    parser.add_argument("--concurrency", type=int, default=MAX_CONCURRENT_CALLS,
+                        help="Calls in flight at once")
     parser.add_argument("--file", type=str, help="Phone list file")
     parser.add_argument("--new-ai", dest="new_ai", action="store_true", help="Create fresh AI assistant")
+    parser.add_argument("--recall", action="store_true", help="Also call numbers called in the last 7 days")
     
     args = parser.parse_args()
     
@@ -729,18 +1181,17 @@ def main():
         # Single test call
         caller = VapiCaller()
         caller.create_assistant()
-        result = caller.make_call(args.phone, "Test Call")
+        result = asyncio.run(caller.make_call(args.phone, "Test Call"))
         print(json.dumps(result, indent=2, default=str))
     else:
         leads = load_leads(args.file)
-        if not leads:
+        if leads is None:
             print("❌ No leads found")
             return
         
-        print(f"📋 Loaded {len(leads)} leads")
-        
         limit = 1 if args.test else args.limit
-        run_audit(leads, limit=limit, only_24h=args.only_24h, delay=args.delay, force_new_ai=args.new_ai)
+        asyncio.run(run_audit(leads, limit=limit, only_24h=args.only_24h, delay=args.delay, force_new_ai=args.new_ai,
+                              concurrency=args.concurrency, recall=args.recall))
 
 
 if __name__ == "__main__":